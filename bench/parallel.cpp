@@ -0,0 +1,96 @@
+#include <webgpu/webgpu.hpp>
+#include <webgpu/webgpu-parallel.hpp>
+
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <thread>
+#include <vector>
+
+// Records the same frame with an increasing amount of threads, to measure how `ParallelRecorder` scales across cores.
+// Runs against the stub runtime in `stub.cpp`, so the timings only include CPU-side recording work.
+
+constexpr uint32_t frameCount = 200;
+constexpr uint32_t jobsPerFrame = 64;
+constexpr uint32_t drawsPerJob = 256;
+
+void recordChunk(wgpu::parallel::RecordingContext& context) {
+    wgpu::RenderPassDescriptor descriptor {};
+    auto renderPass = context.encoder().beginRenderPass(descriptor);
+
+    for (uint32_t i = 0; i < drawsPerJob; i++) {
+        renderPass.setPipeline(reinterpret_cast<WGPURenderPipeline>(uintptr_t(i % 8 + 1)));
+        renderPass.draw(3, 1, i * 3, context.jobIndex());
+    }
+
+    renderPass.end();
+    renderPass.release();
+}
+
+int main() {
+#ifdef WEBGPU_HPP_DYNAMIC_DISPATCH
+    // Bound lazily, which is safe here because the single-threaded run resolves every entry point first.
+    if (!wgpu::dispatch::load(WEBGPU_STUB_LIBRARY)) {
+        std::fprintf(stderr, "failed to load '%s'\n", WEBGPU_STUB_LIBRARY);
+        return 1;
+    }
+#endif
+
+    // The stub runtime never dereferences the device or the queue.
+    wgpu::Device device(reinterpret_cast<WGPUDevice>(uintptr_t(1)));
+    wgpu::Queue queue(reinterpret_cast<WGPUQueue>(uintptr_t(1)));
+
+    uint32_t maxThreads = std::max(std::thread::hardware_concurrency(), 1u);
+    std::vector<uint32_t> threadCounts;
+    for (uint32_t threads = 1; threads < maxThreads; threads *= 2) {
+        threadCounts.push_back(threads);
+    }
+    threadCounts.push_back(maxThreads);
+
+    std::printf("%u frames of %u jobs with %u draws each\n\n", frameCount, jobsPerFrame, drawsPerJob);
+    std::printf("%8s %12s %10s %10s %10s\n", "threads", "frame (us)", "speedup", "stolen", "idle (%)");
+
+    double baseline = 0.0;
+    for (auto threads : threadCounts) {
+        wgpu::parallel::ParallelRecorder recorder(device, threads);
+
+        auto runFrame = [&] {
+            for (uint32_t i = 0; i < jobsPerFrame; i++) {
+                recorder.addJob(recordChunk);
+            }
+
+            recorder.submit(queue);
+        };
+
+        // Warm up, so thread startup and allocations are not measured.
+        for (uint32_t i = 0; i < 10; i++) {
+            runFrame();
+        }
+        recorder.resetStats();
+
+        auto start = std::chrono::steady_clock::now();
+        for (uint32_t i = 0; i < frameCount; i++) {
+            runFrame();
+        }
+        auto elapsed = std::chrono::duration<double, std::micro>(std::chrono::steady_clock::now() - start);
+
+        uint64_t stolen = 0;
+        std::chrono::nanoseconds busy {};
+        std::chrono::nanoseconds idle {};
+        for (auto& stats : recorder.stats()) {
+            stolen += stats.jobsStolen;
+            busy += stats.recordTime;
+            idle += stats.idleTime;
+        }
+
+        double frameTime = elapsed.count() / frameCount;
+        if (threads == 1) {
+            baseline = frameTime;
+        }
+
+        double idlePercent = 100.0 * static_cast<double>(idle.count()) / static_cast<double>((busy + idle).count());
+        std::printf("%8u %12.1f %9.2fx %10llu %10.1f\n", threads, frameTime, baseline / frameTime,
+            static_cast<unsigned long long>(stolen), idlePercent);
+    }
+}
@@ -0,0 +1,160 @@
+#include <webgpu/webgpu.hpp>
+#include <webgpu/webgpu-slotmap.hpp>
+
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <random>
+#include <unordered_map>
+#include <vector>
+
+// Compares `SlotMap<Texture>` against a `std::unordered_map` of handles, for the operations a streaming world does
+// most: inserting, looking up by ID, iterating, replacing objects, and releasing everything at once. Runs against the
+// stub runtime in `stub.cpp`, so releasing a handle costs a single call.
+
+constexpr uint32_t objectCount = 100'000;
+constexpr uint32_t lookupCount = 1'000'000;
+
+using Clock = std::chrono::steady_clock;
+
+// Keeps the compiler from optimizing measured work away.
+volatile uintptr_t sink;
+
+wgpu::Texture fakeTexture(uint32_t i) {
+    return reinterpret_cast<WGPUTexture>(uintptr_t(i + 1) * 16);
+}
+
+template <class F>
+double measure(uint32_t operations, F&& f) {
+    auto start = Clock::now();
+    f();
+    return std::chrono::duration<double, std::nano>(Clock::now() - start).count() / operations;
+}
+
+struct Results {
+    double insert;
+    double lookup;
+    double iterate;
+    double churn;
+    double clear;
+};
+
+Results benchSlotMap(std::vector<uint32_t> const& lookups) {
+    wgpu::slotmap::TextureMap map;
+    std::vector<wgpu::slotmap::TextureMap::Id> ids(objectCount);
+    Results results {};
+
+    results.insert = measure(objectCount, [&] {
+        for (uint32_t i = 0; i < objectCount; i++) {
+            ids[i] = map.insert(fakeTexture(i));
+        }
+    });
+
+    results.lookup = measure(lookupCount, [&] {
+        uintptr_t sum = 0;
+        for (auto i : lookups) {
+            sum += reinterpret_cast<uintptr_t>(static_cast<WGPUTexture>(map.get(ids[i])));
+        }
+        sink = sum;
+    });
+
+    results.iterate = measure(objectCount, [&] {
+        uintptr_t sum = 0;
+        for (auto texture : map.objects()) {
+            sum += reinterpret_cast<uintptr_t>(static_cast<WGPUTexture>(texture));
+        }
+        sink = sum;
+    });
+
+    results.churn = measure(objectCount, [&] {
+        for (uint32_t i = 0; i < objectCount; i += 2) {
+            map.erase(ids[i]);
+            ids[i] = map.insert(fakeTexture(i));
+        }
+    });
+
+    results.clear = measure(objectCount, [&] { map.clear(); });
+    return results;
+}
+
+Results benchUnorderedMap(std::vector<uint32_t> const& lookups) {
+    std::unordered_map<uint32_t, wgpu::Texture> map;
+    std::vector<uint32_t> ids(objectCount);
+    uint32_t nextId = 0;
+    Results results {};
+
+    results.insert = measure(objectCount, [&] {
+        for (uint32_t i = 0; i < objectCount; i++) {
+            ids[i] = nextId++;
+            map.emplace(ids[i], fakeTexture(i));
+        }
+    });
+
+    results.lookup = measure(lookupCount, [&] {
+        uintptr_t sum = 0;
+        for (auto i : lookups) {
+            auto it = map.find(ids[i]);
+            sum += it != map.end() ? reinterpret_cast<uintptr_t>(static_cast<WGPUTexture>(it->second)) : 0;
+        }
+        sink = sum;
+    });
+
+    results.iterate = measure(objectCount, [&] {
+        uintptr_t sum = 0;
+        for (auto& [_, texture] : map) {
+            sum += reinterpret_cast<uintptr_t>(static_cast<WGPUTexture>(texture));
+        }
+        sink = sum;
+    });
+
+    results.churn = measure(objectCount, [&] {
+        for (uint32_t i = 0; i < objectCount; i += 2) {
+            auto it = map.find(ids[i]);
+            it->second.release();
+            map.erase(it);
+
+            ids[i] = nextId++;
+            map.emplace(ids[i], fakeTexture(i));
+        }
+    });
+
+    results.clear = measure(objectCount, [&] {
+        for (auto& [_, texture] : map) {
+            texture.release();
+        }
+        map.clear();
+    });
+
+    return results;
+}
+
+int main() {
+#ifdef WEBGPU_HPP_DYNAMIC_DISPATCH
+    if (!wgpu::dispatch::load(WEBGPU_STUB_LIBRARY)) {
+        std::fprintf(stderr, "failed to load '%s'\n", WEBGPU_STUB_LIBRARY);
+        return 1;
+    }
+#endif
+
+    std::mt19937 random(42);
+    std::uniform_int_distribution<uint32_t> distribution(0, objectCount - 1);
+    std::vector<uint32_t> lookups(lookupCount);
+    for (auto& lookup : lookups) {
+        lookup = distribution(random);
+    }
+
+    // Warm up, so allocator state is comparable between both runs.
+    benchSlotMap(lookups);
+    benchUnorderedMap(lookups);
+
+    auto slotMap = benchSlotMap(lookups);
+    auto unorderedMap = benchUnorderedMap(lookups);
+
+    std::printf("%u textures, %u random lookups, in ns per operation\n\n", objectCount, lookupCount);
+    std::printf("%-10s %14s %14s\n", "", "SlotMap", "unordered_map");
+    std::printf("%-10s %14.2f %14.2f\n", "insert", slotMap.insert, unorderedMap.insert);
+    std::printf("%-10s %14.2f %14.2f\n", "lookup", slotMap.lookup, unorderedMap.lookup);
+    std::printf("%-10s %14.2f %14.2f\n", "iterate", slotMap.iterate, unorderedMap.iterate);
+    std::printf("%-10s %14.2f %14.2f\n", "churn", slotMap.churn, unorderedMap.churn);
+    std::printf("%-10s %14.2f %14.2f\n", "clear", slotMap.clear, unorderedMap.clear);
+}
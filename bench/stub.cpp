@@ -0,0 +1,84 @@
+#include <webgpu/webgpu.h>
+
+#include <cstdint>
+#include <initializer_list>
+#include <utility>
+#include <vector>
+
+// A stub WebGPU runtime, implementing just enough of the C API for the benchmarks. It does not talk to a GPU, so the
+// benchmarks measure the CPU-side overhead of webgpu-hpp and its utility headers without driver noise.
+
+struct WGPUCommandEncoderImpl {
+    std::vector<uint32_t> commands;
+};
+
+struct WGPURenderPassEncoderImpl {
+    WGPUCommandEncoderImpl* encoder;
+};
+
+struct WGPUCommandBufferImpl {
+    std::vector<uint32_t> commands;
+};
+
+// Stand-in for the validation a real implementation does for every command.
+static uint32_t validate(uint32_t value) {
+    for (int i = 0; i < 16; i++) {
+        value ^= value << 13;
+        value ^= value >> 17;
+        value ^= value << 5;
+    }
+
+    return value;
+}
+
+static void push(WGPURenderPassEncoder pass, std::initializer_list<uint32_t> command) {
+    for (auto value : command) {
+        pass->encoder->commands.push_back(validate(value));
+    }
+}
+
+WGPUCommandEncoder wgpuDeviceCreateCommandEncoder(WGPUDevice, WGPUCommandEncoderDescriptor const*) {
+    return new WGPUCommandEncoderImpl {};
+}
+
+void wgpuCommandEncoderRelease(WGPUCommandEncoder encoder) {
+    delete encoder;
+}
+
+WGPURenderPassEncoder wgpuCommandEncoderBeginRenderPass(WGPUCommandEncoder encoder, WGPURenderPassDescriptor const*) {
+    return new WGPURenderPassEncoderImpl { encoder };
+}
+
+void wgpuRenderPassEncoderSetPipeline(WGPURenderPassEncoder pass, WGPURenderPipeline pipeline) {
+    push(pass, { 1, static_cast<uint32_t>(reinterpret_cast<uintptr_t>(pipeline)) });
+}
+
+void wgpuRenderPassEncoderDraw(WGPURenderPassEncoder pass, uint32_t vertexCount, uint32_t instanceCount,
+    uint32_t firstVertex, uint32_t firstInstance) {
+    push(pass, { 2, vertexCount, instanceCount, firstVertex, firstInstance });
+}
+
+void wgpuRenderPassEncoderEnd(WGPURenderPassEncoder pass) {
+    push(pass, { 3 });
+}
+
+void wgpuRenderPassEncoderRelease(WGPURenderPassEncoder pass) {
+    delete pass;
+}
+
+WGPUCommandBuffer wgpuCommandEncoderFinish(WGPUCommandEncoder encoder, WGPUCommandBufferDescriptor const*) {
+    return new WGPUCommandBufferImpl { std::move(encoder->commands) };
+}
+
+void wgpuCommandBufferRelease(WGPUCommandBuffer commandBuffer) {
+    delete commandBuffer;
+}
+
+void wgpuQueueSubmit(WGPUQueue, size_t commandCount, WGPUCommandBuffer const* commands) {
+    for (size_t i = 0; i < commandCount; i++) {
+        commands[i]->commands.clear();
+    }
+}
+
+void wgpuTextureAddRef(WGPUTexture) { }
+void wgpuTextureRelease(WGPUTexture) { }
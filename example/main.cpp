@@ -119,23 +119,6 @@ private:
     }
 
     void initializeWGPU() {
-        // Set up WGPU platform logging
-        wgpu::platform::setLogLevel(wgpu::platform::LogLevel::Info);
-        wgpu::platform::setLogCallback(
-            [](wgpu::platform::LogLevel level, wgpu::StringView message, void*) {
-                spdlog::level::level_enum spdLevel = level == wgpu::platform::LogLevel::Trace
-                    ? spdlog::level::trace
-                    : level == wgpu::platform::LogLevel::Debug
-                    ? spdlog::level::debug
-                    : level == wgpu::platform::LogLevel::Info
-                    ? spdlog::level::info
-                    : level == wgpu::platform::LogLevel::Warn
-                    ? spdlog::level::warn
-                    : spdlog::level::err;
-                spdlog::log(spdLevel, "wgpu log: {}", static_cast<std::string_view>(message));
-            },
-            nullptr);
-
         // Create WGPU instance
         auto instance = wgpu::createInstance(nullptr);
         assert(instance);
@@ -326,6 +309,23 @@ private:
         return surfaceTexture.createView(&textureViewDescriptor);
     }
 
+    // Set up WGPU platform logging. Messages are formatted on the sink's own thread, not the driver's.
+    wgpu::platform::LogSink m_logSink { {
+        .level = wgpu::platform::LogLevel::Info,
+        .callback = [](wgpu::platform::LogLevel level, wgpu::StringView message, void*) {
+            spdlog::level::level_enum spdLevel = level == wgpu::platform::LogLevel::Trace
+                ? spdlog::level::trace
+                : level == wgpu::platform::LogLevel::Debug
+                ? spdlog::level::debug
+                : level == wgpu::platform::LogLevel::Info
+                ? spdlog::level::info
+                : level == wgpu::platform::LogLevel::Warn
+                ? spdlog::level::warn
+                : spdlog::level::err;
+            spdlog::log(spdLevel, "wgpu log: {}", static_cast<std::string_view>(message));
+        },
+    } };
+
     GLFWwindow* m_window {};
 
     wgpu::Device m_device {};
@@ -13,6 +13,7 @@ wgpu_native_version = 'v24.0.0.2'
 parser = argparse.ArgumentParser('fetch.py')
 parser.add_argument('--target', help='target specifier to download / compile', required=True)
 parser.add_argument('--bin-dir', help='output directory to put the downloaded target in', required=True)
+parser.add_argument('--dynamic-dispatch', help='call the C API through a table loaded at runtime', action='store_true')
 args = parser.parse_args()
 
 target_dir = f"{args.bin_dir}/{args.target}"
@@ -40,6 +41,6 @@ with open(f"{target_dir}/wgpu-native-meta/webgpu.yml", 'r') as f:
     spec = yaml.safe_load(f)
 
 print('generating webgpu.hpp')
-cpp_src = gen.generate_webgpu_hpp(spec)
+cpp_src = gen.generate_webgpu_hpp(spec, dynamic_dispatch=args.dynamic_dispatch)
 with open(f"{target_dir}/include/webgpu/webgpu.hpp", 'w') as f:
     f.write(cpp_src)
\ No newline at end of file
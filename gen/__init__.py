@@ -2,7 +2,7 @@ from .cpp_structs import *
 from .cpp_types import *
 
 
-def generate_webgpu_hpp(spec: any):
+def generate_webgpu_hpp(spec: any, dynamic_dispatch: bool = False):
     enum_prefix = spec['enum_prefix']
     enum_prefix = int(enum_prefix[2:], base=16) if enum_prefix.startswith('0x') else int(enum_prefix)
 
@@ -60,23 +60,80 @@ def generate_webgpu_hpp(spec: any):
     struct_definitions = SourceBuilder()
     for i, s in enumerate(sorted_structs):
         if i != 0: struct_definitions.append('\n')
-        s.append_definition(struct_definitions)
+        s.append_definition(struct_definitions, dynamic_dispatch)
 
     function_definitions = SourceBuilder()
     for i, f in enumerate(functions):
         if i != 0: function_definitions.append('\n')
-        f.append_definition(function_definitions)
+        f.append_definition(function_definitions, dynamic_dispatch=dynamic_dispatch)
 
     method_definitions = SourceBuilder()
     for i, o in enumerate(objects):
         if i != 0: method_definitions.append('\n')
 
         method_definitions.append(f"// - {o.name}\n")
-        o.append_builtin_method_definitions(method_definitions)
+        o.append_builtin_method_definitions(method_definitions, dynamic_dispatch)
 
         for f in o.methods:
             method_definitions.append('\n')
-            f.append_definition(method_definitions, object_name=o.name)
+            f.append_definition(method_definitions, object_name=o.name, dynamic_dispatch=dynamic_dispatch)
+
+    # When dynamic dispatch is enabled, every C function is called through a table loaded at runtime
+    dispatch_includes = ''
+    dispatch_definitions = ''
+    if dynamic_dispatch:
+        dispatch_table = DispatchTable()
+        for f in functions:
+            dispatch_table.add(f.c_function_name())
+        for o in objects:
+            dispatch_table.add(f"wgpu{o.name}AddRef")
+            dispatch_table.add(f"wgpu{o.name}Release")
+            for f in o.methods:
+                dispatch_table.add(f.c_function_name(o.name))
+        for s in structs:
+            if s.has_release:
+                dispatch_table.add(f"wgpu{s.name}FreeMembers")
+
+        for name in NATIVE_FUNCTIONS:
+            dispatch_table.add(name, native=True)
+
+        dispatch_builder = SourceBuilder()
+        dispatch_table.append_definition(dispatch_builder)
+        dispatch_definitions = f"\n// -- DYNAMIC DISPATCH --\n{dispatch_builder}"
+
+        dispatch_includes = """
+#include <webgpu/wgpu.h>
+
+#include <cstdio>
+#include <cstdlib>
+
+#if defined(_WIN32)
+#   ifndef WIN32_LEAN_AND_MEAN
+#       define WIN32_LEAN_AND_MEAN
+#   endif
+#   ifndef NOMINMAX
+#       define NOMINMAX
+#   endif
+#   include <windows.h>
+#else
+#   include <dlfcn.h>
+#   if defined(__APPLE__)
+#       include <mach-o/dyld.h>
+#   else
+#       include <unistd.h>
+#   endif
+#endif
+
+#ifndef WEBGPU_HPP_DEFAULT_LIBRARY
+#   if defined(_WIN32)
+#       define WEBGPU_HPP_DEFAULT_LIBRARY "wgpu_native.dll"
+#   elif defined(__APPLE__)
+#       define WEBGPU_HPP_DEFAULT_LIBRARY "libwgpu_native.dylib"
+#   else
+#       define WEBGPU_HPP_DEFAULT_LIBRARY "libwgpu_native.so"
+#   endif
+#endif
+"""
 
     # C++ template assembly
     disabled_lints = '*-explicit-constructor, *-explicit-constructor, *-noexcept-*'
@@ -102,14 +159,14 @@ def generate_webgpu_hpp(spec: any):
 #include <string_view>
 #include <type_traits>
 #include <vector>
-
+{dispatch_includes}
 // ReSharper disable CppSpecialFunctionWithoutNoexceptSpecification
 // NOLINTBEGIN({disabled_lints})
 
 namespace wgpu {{
 
 typedef WGPUBool Bool;
-
+{dispatch_definitions}
 // -- FORWARD DECLARATIONS --
 {forward_declarations}
 
@@ -0,0 +1,176 @@
+from .cpp_util import *
+
+
+# wgpu-native specific functions used by `webgpu-platform.hpp`. They are not part of the spec, but some of them are
+# called often, like `wgpuDevicePoll` by the poll scheduler, so they are resolved through the table as well.
+NATIVE_FUNCTIONS = [
+    'wgpuDevicePoll',
+    'wgpuQueueSubmitForIndex',
+    'wgpuSetLogCallback',
+    'wgpuSetLogLevel',
+]
+
+
+class DispatchEntry:
+    c_name: str
+    native: bool
+
+    def __init__(self, c_name: str, native: bool = False):
+        self.c_name = c_name
+        self.native = native
+
+    def member_name(self) -> str:
+        name = self.c_name.removeprefix('wgpu')
+        return name[0].lower() + name[1:]
+
+    def proc_type(self) -> str:
+        if self.native:
+            return f"decltype(&::{self.c_name})"
+        return f"WGPUProc{self.c_name.removeprefix('wgpu')}"
+
+    def call_expression(self) -> str:
+        return f"dispatch::call(dispatch::table.{self.member_name()}, \"{self.c_name}\")"
+
+
+class DispatchTable:
+    entries: list[DispatchEntry]
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, c_name: str, native: bool = False):
+        self.entries.append(DispatchEntry(c_name, native))
+
+    def append_definition(self, b: SourceBuilder):
+        members = SourceBuilder()
+        for e in self.entries:
+            members.append(indent(1, f"{e.proc_type()} {e.member_name()} {{}};\n"))
+
+        bindings = SourceBuilder()
+        for e in self.entries:
+            bindings.append(indent(1, f"found &= bind(table.{e.member_name()}, \"{e.c_name}\");\n"))
+
+        b.append(f"""namespace dispatch {{
+
+/**
+ * When the entry points of the loaded library are resolved.
+ **/
+enum class Binding : uint32_t {{
+    /**
+     * Every entry point is resolved the first time it is called.
+     **/
+    Lazy = 0,
+    /**
+     * Every entry point is resolved when the library is loaded.
+     **/
+    Eager = 1,
+}};
+
+/**
+ * One function pointer for every function in the spec. Entries may be replaced, for example to instrument calls.
+ **/
+struct Table {{
+{members}}};
+
+inline Table table {{}};
+inline void* library {{}};
+
+inline void* symbol(const char* name) {{
+#if defined(_WIN32)
+    return reinterpret_cast<void*>(GetProcAddress(static_cast<HMODULE>(library), name));
+#else
+    return dlsym(library, name);
+#endif
+}}
+
+template <class Proc>
+inline bool bind(Proc& proc, const char* name) {{
+    proc = reinterpret_cast<Proc>(symbol(name));
+    return proc != nullptr;
+}}
+
+inline bool bindAll() {{
+    bool found = true;
+{bindings}    return found;
+}}
+
+/**
+ * Open the given library. Like on Windows, bare file names are looked up next to the executable first, as nothing
+ * is linked that would add the executable's directory to the search path.
+ **/
+inline void* open(const char* path) {{
+#if defined(_WIN32)
+    return reinterpret_cast<void*>(LoadLibraryA(path));
+#else
+    if (!std::strchr(path, '/')) {{
+        char executable[4096] {{}};
+#   if defined(__APPLE__)
+        uint32_t size = sizeof(executable);
+        bool found = _NSGetExecutablePath(executable, &size) == 0;
+#   else
+        bool found = readlink("/proc/self/exe", executable, sizeof(executable) - 1) > 0;
+#   endif
+
+        auto separator = found ? std::strrchr(executable, '/') : nullptr;
+        if (separator) {{
+            auto nextToExecutable = std::string(executable, separator + 1) + path;
+            if (auto handle = dlopen(nextToExecutable.c_str(), RTLD_NOW | RTLD_LOCAL)) {{
+                return handle;
+            }}
+        }}
+    }}
+
+    return dlopen(path, RTLD_NOW | RTLD_LOCAL);
+#endif
+}}
+
+/**
+ * Close the loaded library, and clear the dispatch table.
+ **/
+inline void unload() {{
+    if (library) {{
+#if defined(_WIN32)
+        FreeLibrary(static_cast<HMODULE>(library));
+#else
+        dlclose(library);
+#endif
+    }}
+
+    library = nullptr;
+    table = {{}};
+}}
+
+/**
+ * Load the WebGPU implementation from the given library, replacing any library loaded before. With `Binding::Eager`,
+ * returns false if any entry point is missing.
+ *
+ * Lazy binding writes to the table on first use, so load eagerly before calling into WebGPU from multiple threads.
+ **/
+inline bool load(const char* path = WEBGPU_HPP_DEFAULT_LIBRARY, Binding binding = Binding::Lazy) {{
+    unload();
+
+    library = open(path);
+    if (!library) {{
+        return false;
+    }}
+
+    return binding == Binding::Lazy || bindAll();
+}}
+
+/**
+ * Return the given entry point, resolving it on first use. The default library is loaded if none was loaded yet.
+ **/
+template <class Proc>
+inline Proc call(Proc& proc, const char* name) {{
+    if (!proc) [[unlikely]] {{
+        if ((!library && !load()) || !bind(proc, name)) {{
+            std::fprintf(stderr, "webgpu-hpp: failed to resolve '%s'\\n", name);
+            std::abort();
+        }}
+    }}
+
+    return proc;
+}}
+
+}}
+""")
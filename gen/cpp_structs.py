@@ -1,3 +1,4 @@
+from .cpp_dispatch import *
 from .cpp_types import *
 from .cpp_util import *
 
@@ -12,7 +13,7 @@ class Struct:
     def append_forward_declaration(self, b: SourceBuilder):
         b.append(f"struct {self.name};\n")
 
-    def append_definition(self, b: SourceBuilder):
+    def append_definition(self, b: SourceBuilder, dynamic_dispatch: bool = False):
         c_type = f"WGPU{self.name}"
         no_discard = '[[nodiscard]] ' if self.has_release else ''
 
@@ -23,6 +24,8 @@ class Struct:
 
         if self.has_release:
             c_release_func = f"wgpu{self.name}FreeMembers"
+            if dynamic_dispatch:
+                c_release_func = DispatchEntry(c_release_func).call_expression()
             b.append(indent(1, f"void release() {{ {c_release_func}(*this); }}\n"))
 
         b.append('\n')
@@ -49,12 +52,17 @@ class Function:
         b.append(indent(l, doc_comment(self.doc)))
         b.append(indent(l, f"{self.return_type.cpp_type()} {self.name}({f_args});\n"))
 
-    def append_definition(self, b: SourceBuilder, object_name: str | None = None):
+    def c_function_name(self, object_name: str | None = None) -> str:
+        capitalized_name = capitalize_first_letter(self.name)
+        return f"wgpu{object_name}{capitalized_name}" if object_name is not None else f"wgpu{capitalized_name}"
+
+    def append_definition(self, b: SourceBuilder, object_name: str | None = None, dynamic_dispatch: bool = False):
         f_args = ', '.join([p.cpp_function_parameter() for p in self.args])
         func_name = f"{object_name}::{self.name}" if object_name is not None else self.name
 
-        capitalized_name = capitalize_first_letter(self.name)
-        c_func_name = f"wgpu{object_name}{capitalized_name}" if object_name is not None else f"wgpu{capitalized_name}"
+        c_func_name = self.c_function_name(object_name)
+        if dynamic_dispatch:
+            c_func_name = DispatchEntry(c_func_name).call_expression()
 
         # FIXME: Pointers to structs can't be implicitly converted, so we have to be explicit about it.
         def should_reinterpret(type_: Type):
@@ -140,13 +148,19 @@ class ObjectClass:
         b.append(indent(1, f"{c_type}Impl* m_ptr {{}};\n"))
         b.append('};\n')
 
-    def append_builtin_method_definitions(self, b: SourceBuilder):
+    def append_builtin_method_definitions(self, b: SourceBuilder, dynamic_dispatch: bool = False):
+        c_add_ref_func = f"wgpu{self.name}AddRef"
+        c_release_func = f"wgpu{self.name}Release"
+        if dynamic_dispatch:
+            c_add_ref_func = DispatchEntry(c_add_ref_func).call_expression()
+            c_release_func = DispatchEntry(c_release_func).call_expression()
+
         b.append(f"inline void {self.name}::addRef() {{\n")
-        b.append(indent(1, f"wgpu{self.name}AddRef(m_ptr);\n"))
+        b.append(indent(1, f"{c_add_ref_func}(m_ptr);\n"))
         b.append('}\n\n')
 
         b.append(f"inline void {self.name}::release() {{\n")
-        b.append(indent(1, f"wgpu{self.name}Release(m_ptr);\n"))
+        b.append(indent(1, f"{c_release_func}(m_ptr);\n"))
         b.append('}\n')
 
 
@@ -0,0 +1,744 @@
+import hashlib
+import re
+
+from .cpp_util import *
+
+
+class WgslError(Exception):
+    pass
+
+
+class WgslType:
+    name: str
+    args: list  # of WgslType or int
+
+    def __init__(self, name: str, args: list | None = None):
+        self.name = name
+        self.args = args or []
+
+    def __str__(self):
+        if not self.args:
+            return self.name
+        return f"{self.name}<{', '.join(str(a) for a in self.args)}>"
+
+
+class WgslMember:
+    name: str
+    type_: WgslType
+    align: int | None
+    size: int | None
+
+    def __init__(self, name: str, type_: WgslType, align: int | None = None, size: int | None = None):
+        self.name = name
+        self.type_ = type_
+        self.align = align
+        self.size = size
+
+
+class WgslStruct:
+    name: str
+    members: list[WgslMember]
+
+    def __init__(self, name: str, members: list[WgslMember]):
+        self.name = name
+        self.members = members
+
+
+class WgslBinding:
+    group: int
+    binding: int
+    name: str
+    address_space: str | None
+    access: str | None
+    type_: WgslType
+
+    def __init__(self, group: int, binding: int, name: str, address_space: str | None, access: str | None,
+                 type_: WgslType):
+        self.group = group
+        self.binding = binding
+        self.name = name
+        self.address_space = address_space
+        self.access = access
+        self.type_ = type_
+
+
+class WgslModule:
+    structs: dict[str, WgslStruct]
+    aliases: dict[str, WgslType]
+    constants: dict[str, int]
+    bindings: list[WgslBinding]
+    stages: set[str]
+
+    def __init__(self):
+        self.structs = {}
+        self.aliases = {}
+        self.constants = {}
+        self.bindings = []
+        self.stages = set()
+
+
+# -- PARSING --
+def strip_comments(source: str) -> str:
+    out = []
+    i = 0
+    depth = 0
+    while i < len(source):
+        if source.startswith('/*', i):
+            depth += 1
+            i += 2
+        elif depth > 0 and source.startswith('*/', i):
+            depth -= 1
+            i += 2
+        elif depth > 0:
+            # Keep newlines, so line numbers in errors stay correct.
+            if source[i] == '\n':
+                out.append('\n')
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end == -1 else end
+        else:
+            out.append(source[i])
+            i += 1
+
+    return ''.join(out)
+
+
+TOKEN_PATTERN = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|(0[xX][0-9a-fA-F]+|[0-9]+)[iuf]?|(.))")
+
+
+def tokenize(source: str) -> list[str]:
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(source):
+        ident, number, punct = match.groups()
+        if ident is not None:
+            tokens.append(ident)
+        elif number is not None:
+            tokens.append(number)
+        elif punct is not None and not punct.isspace():
+            tokens.append(punct)
+
+    return tokens
+
+
+class Parser:
+    tokens: list[str]
+    pos: int
+    module: WgslModule
+
+    def __init__(self, source: str):
+        self.tokens = tokenize(strip_comments(source))
+        self.pos = 0
+        self.module = WgslModule()
+
+    def peek(self, offset: int = 0) -> str | None:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def next(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise WgslError('unexpected end of file')
+        self.pos += 1
+        return token
+
+    def expect(self, expected: str):
+        token = self.next()
+        if token != expected:
+            raise WgslError(f"expected '{expected}', got '{token}'")
+
+    def parse_int(self, token: str) -> int:
+        if token in self.module.constants:
+            return self.module.constants[token]
+        try:
+            return int(token, 0)
+        except ValueError:
+            raise WgslError(f"expected an integer constant, got '{token}'")
+
+    def parse_attributes(self) -> dict[str, list[str]]:
+        attributes = {}
+        while self.peek() == '@':
+            self.next()
+            name = self.next()
+            args = []
+            if self.peek() == '(':
+                self.next()
+                while self.peek() != ')':
+                    args.append(self.next())
+                self.next()
+            attributes[name] = [a for a in args if a != ',']
+
+        return attributes
+
+    def parse_type(self) -> WgslType:
+        name = self.next()
+        args = []
+        if self.peek() == '<':
+            self.next()
+            while True:
+                if self.peek(1) in [',', '>'] and not self.is_type_name(self.peek()):
+                    args.append(self.parse_type_argument(self.next()))
+                else:
+                    args.append(self.parse_type())
+
+                token = self.next()
+                if token == '>':
+                    break
+                if token != ',':
+                    raise WgslError(f"expected ',' or '>' in type arguments, got '{token}'")
+                if self.peek() == '>':
+                    self.next()
+                    break
+
+        return WgslType(name, args)
+
+    def is_type_name(self, token: str) -> bool:
+        return token in self.module.structs or token in self.module.aliases or token in SCALAR_TYPES \
+            or token in VECTOR_SHORTHANDS or token in MATRIX_SHORTHANDS or token.startswith(('vec', 'mat', 'array'))
+
+    def parse_type_argument(self, token: str) -> int | str:
+        if token[0].isdigit() or token in self.module.constants:
+            return self.parse_int(token)
+        return token
+
+    def skip_statement(self):
+        depth = 0
+        while True:
+            token = self.next()
+            if token in ['{', '(', '[']:
+                depth += 1
+            elif token in ['}', ')', ']']:
+                depth -= 1
+            elif token == ';' and depth == 0:
+                return
+
+    def skip_block(self):
+        while self.next() != '{':
+            pass
+
+        depth = 1
+        while depth > 0:
+            token = self.next()
+            if token == '{':
+                depth += 1
+            elif token == '}':
+                depth -= 1
+
+    def parse_struct(self):
+        name = self.next()
+        self.expect('{')
+
+        members = []
+        while self.peek() != '}':
+            attributes = self.parse_attributes()
+            member_name = self.next()
+            self.expect(':')
+            member_type = self.parse_type()
+
+            align = self.parse_int(attributes['align'][0]) if 'align' in attributes else None
+            size = self.parse_int(attributes['size'][0]) if 'size' in attributes else None
+            members.append(WgslMember(member_name, member_type, align, size))
+
+            if self.peek() == ',':
+                self.next()
+
+        self.expect('}')
+        if self.peek() == ';':
+            self.next()
+
+        self.module.structs[name] = WgslStruct(name, members)
+
+    def parse_var(self, attributes: dict[str, list[str]]):
+        address_space = None
+        access = None
+        if self.peek() == '<':
+            self.next()
+            address_space = self.next()
+            if self.peek() == ',':
+                self.next()
+                access = self.next()
+            self.expect('>')
+
+        name = self.next()
+        self.expect(':')
+        type_ = self.parse_type()
+        self.skip_statement()
+
+        if 'group' in attributes and 'binding' in attributes:
+            group = self.parse_int(attributes['group'][0])
+            binding = self.parse_int(attributes['binding'][0])
+            self.module.bindings.append(WgslBinding(group, binding, name, address_space, access, type_))
+
+    def parse_const(self):
+        name = self.next()
+        if self.peek() == ':':
+            self.next()
+            self.parse_type()
+        self.expect('=')
+
+        # Only plain integer constants are evaluated, as they can be used as array sizes.
+        value = self.peek()
+        if value is not None and value[0].isdigit() and self.peek(1) == ';':
+            self.module.constants[name] = int(value, 0)
+        self.skip_statement()
+
+    def parse(self) -> WgslModule:
+        while self.peek() is not None:
+            attributes = self.parse_attributes()
+            token = self.next()
+
+            if token == 'struct':
+                self.parse_struct()
+            elif token == 'var':
+                self.parse_var(attributes)
+            elif token == 'alias':
+                name = self.next()
+                self.expect('=')
+                self.module.aliases[name] = self.parse_type()
+                self.expect(';')
+            elif token == 'const':
+                self.parse_const()
+            elif token == 'fn':
+                for stage in ['vertex', 'fragment', 'compute']:
+                    if stage in attributes:
+                        self.module.stages.add(stage)
+                self.skip_block()
+            elif token != ';':
+                self.pos -= 1
+                self.skip_statement()
+
+        return self.module
+
+
+def parse_wgsl(source: str) -> WgslModule:
+    return Parser(source).parse()
+
+
+# -- LAYOUT --
+SCALAR_TYPES = {
+    # name: (align, size, c++ type)
+    'f32': (4, 4, 'float'),
+    'i32': (4, 4, 'int32_t'),
+    'u32': (4, 4, 'uint32_t'),
+    'f16': (2, 2, 'uint16_t'),
+}
+
+VECTOR_SHORTHANDS = {f"vec{n}{s}": (n, t) for n in [2, 3, 4] for s, t in [('f', 'f32'), ('i', 'i32'), ('u', 'u32'), ('h', 'f16')]}
+MATRIX_SHORTHANDS = {f"mat{c}x{r}{s}": (c, r, t) for c in [2, 3, 4] for r in [2, 3, 4] for s, t in [('f', 'f32'), ('h', 'f16')]}
+
+
+def round_up(align: int, value: int) -> int:
+    return (value + align - 1) // align * align
+
+
+class Layout:
+    align: int
+    size: int
+    cpp_type: str
+    # Whether this is a runtime-sized array, which has no C++ equivalent.
+    runtime_sized: bool
+
+    def __init__(self, align: int, size: int, cpp_type: str, runtime_sized: bool = False):
+        self.align = align
+        self.size = size
+        self.cpp_type = cpp_type
+        self.runtime_sized = runtime_sized
+
+
+class LayoutResolver:
+    module: WgslModule
+
+    def __init__(self, module: WgslModule):
+        self.module = module
+
+    def resolve(self, type_: WgslType) -> WgslType:
+        while type_.name in self.module.aliases and not type_.args:
+            type_ = self.module.aliases[type_.name]
+        return type_
+
+    def element_type(self, type_: WgslType) -> WgslType:
+        if not type_.args:
+            raise WgslError(f"type '{type_}' is missing its element type")
+        element = type_.args[0]
+        return self.resolve(element) if isinstance(element, WgslType) else WgslType(str(element))
+
+    def element_name(self, type_: WgslType) -> str:
+        return self.element_type(type_).name
+
+    def vector(self, count: int, scalar: str) -> Layout:
+        if scalar not in SCALAR_TYPES:
+            raise WgslError(f"vector or matrix of '{scalar}' is not host-shareable")
+        scalar_align, scalar_size, cpp_type = SCALAR_TYPES[scalar]
+        align = scalar_align * (4 if count == 3 else count)
+        return Layout(align, scalar_size * count, f"std::array<{cpp_type}, {count}>")
+
+    def matrix(self, columns: int, rows: int, scalar: str) -> Layout:
+        if scalar not in ['f32', 'f16']:
+            raise WgslError(f"matrix of '{scalar}' is not allowed")
+        column = self.vector(rows, scalar)
+        stride = round_up(column.align, column.size)
+        padded_rows = stride // SCALAR_TYPES[scalar][1]
+        cpp_type = f"std::array<std::array<{SCALAR_TYPES[scalar][2]}, {padded_rows}>, {columns}>"
+        return Layout(column.align, columns * stride, cpp_type)
+
+    def layout(self, type_: WgslType) -> Layout:
+        type_ = self.resolve(type_)
+        name = type_.name
+
+        if name in SCALAR_TYPES:
+            align, size, cpp_type = SCALAR_TYPES[name]
+            return Layout(align, size, cpp_type)
+        if name == 'atomic':
+            return self.layout(self.element_type(type_))
+        if name in VECTOR_SHORTHANDS:
+            return self.vector(*VECTOR_SHORTHANDS[name])
+        if name in ['vec2', 'vec3', 'vec4']:
+            return self.vector(int(name[3]), self.element_name(type_))
+        if name in MATRIX_SHORTHANDS:
+            return self.matrix(*MATRIX_SHORTHANDS[name])
+        if re.fullmatch(r"mat[234]x[234]", name):
+            return self.matrix(int(name[3]), int(name[5]), self.element_name(type_))
+        if name == 'array':
+            return self.array(type_)
+        if name in self.module.structs:
+            return self.struct(self.module.structs[name])
+
+        raise WgslError(f"type '{type_}' is not host-shareable")
+
+    def array(self, type_: WgslType) -> Layout:
+        element_type = self.element_type(type_)
+        element = self.layout(element_type)
+        stride = round_up(element.align, element.size)
+
+        element_cpp_type = element.cpp_type
+        if stride != element.size:
+            # Only three-component vectors have a stride larger than their size. Widen them to four components,
+            # where the last one is padding.
+            element_cpp_type = element_cpp_type.replace(', 3>', ', 4>')
+
+        if len(type_.args) < 2:
+            return Layout(element.align, stride, element_cpp_type, runtime_sized=True)
+
+        count = type_.args[1]
+        if not isinstance(count, int):
+            raise WgslError(f"array size '{count}' is not an integer constant")
+
+        return Layout(element.align, stride * count, f"std::array<{element_cpp_type}, {count}>")
+
+    def struct(self, struct: WgslStruct) -> Layout:
+        align = 1
+        offset = 0
+        for member in struct.members:
+            layout = self.layout(member.type_)
+            member_align = member.align or layout.align
+            member_size = member.size or layout.size
+
+            offset = round_up(member_align, offset) + member_size
+            align = max(align, member_align)
+
+        return Layout(align, round_up(align, offset), struct.name)
+
+    def struct_members(self, struct: WgslStruct) -> list[tuple[WgslMember, Layout, int, int]]:
+        """Return every member with its layout, offset and size, as laid out in memory."""
+        members = []
+        offset = 0
+        for member in struct.members:
+            layout = self.layout(member.type_)
+            offset = round_up(member.align or layout.align, offset)
+            size = member.size or layout.size
+            members.append((member, layout, offset, size))
+            offset += size
+
+        return members
+
+
+# -- C++ EMISSION --
+TEXEL_FORMATS = {
+    'r8unorm': 'R8Unorm',
+    'r8snorm': 'R8Snorm',
+    'r8uint': 'R8Uint',
+    'r8sint': 'R8Sint',
+    'rg8unorm': 'RG8Unorm',
+    'rg8snorm': 'RG8Snorm',
+    'rg8uint': 'RG8Uint',
+    'rg8sint': 'RG8Sint',
+    'r16uint': 'R16Uint',
+    'r16sint': 'R16Sint',
+    'r16float': 'R16Float',
+    'rg16uint': 'RG16Uint',
+    'rg16sint': 'RG16Sint',
+    'rg16float': 'RG16Float',
+    'rgba8unorm': 'RGBA8Unorm',
+    'rgba8snorm': 'RGBA8Snorm',
+    'rgba8uint': 'RGBA8Uint',
+    'rgba8sint': 'RGBA8Sint',
+    'rgba16uint': 'RGBA16Uint',
+    'rgba16sint': 'RGBA16Sint',
+    'rgba16float': 'RGBA16Float',
+    'r32uint': 'R32Uint',
+    'r32sint': 'R32Sint',
+    'r32float': 'R32Float',
+    'rg32uint': 'RG32Uint',
+    'rg32sint': 'RG32Sint',
+    'rg32float': 'RG32Float',
+    'rgba32uint': 'RGBA32Uint',
+    'rgba32sint': 'RGBA32Sint',
+    'rgba32float': 'RGBA32Float',
+    'bgra8unorm': 'BGRA8Unorm',
+}
+
+VIEW_DIMENSIONS = {
+    '1d': '_1D',
+    '2d': '_2D',
+    '2d_array': '_2DArray',
+    '3d': '_3D',
+    'cube': 'Cube',
+    'cube_array': 'CubeArray',
+}
+
+SAMPLE_TYPES = {
+    'f32': 'Float',
+    'i32': 'Sint',
+    'u32': 'Uint',
+}
+
+STORAGE_ACCESS = {
+    'read': 'ReadOnly',
+    'write': 'WriteOnly',
+    'read_write': 'ReadWrite',
+}
+
+
+def append_struct_definition(b: SourceBuilder, resolver: LayoutResolver, struct: WgslStruct):
+    layout = resolver.struct(struct)
+
+    b.append(doc_comment(f"WGSL `struct {struct.name}`, with an alignment of {layout.align} and a size of {layout.size}."))
+    b.append(f"struct alignas({layout.align}) {struct.name} {{\n")
+
+    offset = 0
+    padding = 0
+    asserts = []
+    runtime_array = None
+    for member, member_layout, member_offset, size in resolver.struct_members(struct):
+        if member_offset > offset:
+            b.append(indent(1, f"uint8_t _pad{padding}[{member_offset - offset}];\n"))
+            padding += 1
+
+        if member_layout.runtime_sized:
+            # Runtime-sized arrays have to be the last member, and are not part of the C++ struct.
+            runtime_array = (member, member_layout)
+            offset = member_offset
+            break
+
+        b.append(indent(1, f"{member_layout.cpp_type} {member.name};\n"))
+        asserts.append(f"static_assert(offsetof({struct.name}, {member.name}) == {member_offset});\n")
+
+        if size > member_layout.size:
+            b.append(indent(1, f"uint8_t _pad{padding}[{size - member_layout.size}];\n"))
+            padding += 1
+
+        offset = member_offset + size
+
+    if runtime_array is None and layout.size > offset:
+        b.append(indent(1, f"uint8_t _pad{padding}[{layout.size - offset}];\n"))
+
+    if runtime_array is not None:
+        member, member_layout = runtime_array
+        b.append('\n')
+        b.append(indent(1, doc_comment(f"`{member.name}` is a runtime-sized array starting at this offset.")))
+        b.append(indent(1, f"using {capitalize_first_letter(member.name)}Element = {member_layout.cpp_type};\n"))
+        b.append(indent(1, f"constexpr static size_t {member.name}Offset = {offset};\n"))
+        b.append(indent(1, f"constexpr static size_t {member.name}Stride = {member_layout.size};\n"))
+
+    b.append('};\n\n')
+
+    if runtime_array is None:
+        b.append(f"static_assert(sizeof({struct.name}) == {layout.size});\n")
+    b.append(f"static_assert(alignof({struct.name}) == {layout.align});\n")
+    [b.append(a) for a in asserts]
+
+
+def binding_min_size(resolver: LayoutResolver, type_: WgslType) -> int:
+    layout = resolver.layout(type_)
+    if layout.runtime_sized:
+        return layout.size
+
+    resolved = resolver.resolve(type_)
+    if resolved.name in resolver.module.structs:
+        struct = resolver.module.structs[resolved.name]
+        last_member, last_layout, last_offset, _ = resolver.struct_members(struct)[-1]
+        if last_layout.runtime_sized:
+            # The minimum size of a struct ending in a runtime-sized array includes one element.
+            return round_up(layout.align, last_offset + last_layout.size)
+
+    return layout.size
+
+
+def binding_lookup(table: dict[str, str], key: any, what: str, binding: WgslBinding) -> str:
+    if str(key) not in table:
+        raise WgslError(f"unsupported {what} '{key}' for '{binding.name}'")
+    return table[str(key)]
+
+
+def binding_type_arg(type_: WgslType, index: int, binding: WgslBinding) -> any:
+    if index >= len(type_.args):
+        raise WgslError(f"binding type '{type_}' for '{binding.name}' is missing type arguments")
+    return type_.args[index]
+
+
+def binding_entry(resolver: LayoutResolver, binding: WgslBinding, stages: list[str]) -> str:
+    type_ = resolver.resolve(binding.type_)
+    buffer_type = 'BindingNotUsed'
+    sampler_type = 'BindingNotUsed'
+    sample_type = 'BindingNotUsed'
+    storage_access = 'BindingNotUsed'
+    view_dimension = 'Undefined'
+    storage_format = 'Undefined'
+    min_binding_size = 0
+    multisampled = False
+
+    if binding.address_space == 'uniform':
+        buffer_type = 'Uniform'
+    elif binding.address_space == 'storage':
+        buffer_type = 'Storage' if binding.access == 'read_write' else 'ReadOnlyStorage'
+    elif type_.name in ['sampler', 'sampler_comparison']:
+        sampler_type = 'Comparison' if type_.name == 'sampler_comparison' else 'Filtering'
+    elif type_.name == 'texture_external':
+        # External textures need a chained `ExternalTextureBindingLayout`, which wgpu-native does not support.
+        raise WgslError(f"unsupported binding type '{type_}' for '{binding.name}'")
+    elif type_.name.startswith('texture_storage_'):
+        dimension = type_.name.removeprefix('texture_storage_')
+        view_dimension = binding_lookup(VIEW_DIMENSIONS, dimension, 'texture dimension', binding)
+        storage_format = binding_lookup(TEXEL_FORMATS, binding_type_arg(type_, 0, binding), 'texel format', binding)
+        storage_access = binding_lookup(STORAGE_ACCESS, binding_type_arg(type_, 1, binding), 'access mode', binding)
+    elif type_.name.startswith('texture_depth_'):
+        dimension = type_.name.removeprefix('texture_depth_')
+        multisampled = dimension.startswith('multisampled_')
+        sample_type = 'Depth'
+        view_dimension = binding_lookup(VIEW_DIMENSIONS, dimension.removeprefix('multisampled_'), 'texture dimension',
+                                        binding)
+    elif type_.name.startswith('texture_'):
+        dimension = type_.name.removeprefix('texture_')
+        multisampled = dimension.startswith('multisampled_')
+        sampled_type = binding_type_arg(type_, 0, binding)
+        if isinstance(sampled_type, WgslType):
+            sampled_type = resolver.resolve(sampled_type).name
+        sample_type = binding_lookup(SAMPLE_TYPES, sampled_type, 'sampled type', binding)
+        # Multisampled textures can't be filtered, so they can't use the filterable float sample type.
+        if multisampled and sample_type == 'Float':
+            sample_type = 'UnfilterableFloat'
+        view_dimension = binding_lookup(VIEW_DIMENSIONS, dimension.removeprefix('multisampled_'), 'texture dimension',
+                                        binding)
+    else:
+        raise WgslError(f"unsupported binding type '{type_}' for '{binding.name}'")
+
+    if buffer_type != 'BindingNotUsed':
+        min_binding_size = binding_min_size(resolver, type_)
+
+    # Writable storage bindings are not allowed in vertex shaders.
+    if buffer_type == 'Storage' or storage_access in ['WriteOnly', 'ReadWrite']:
+        stages = [s for s in stages if s != 'vertex']
+    visibility = ' | '.join(f"wgpu::ShaderStage::{pascal_case(s)}" for s in stages) or 'wgpu::ShaderStage::None'
+
+    return f"""{{
+    .binding = {binding.binding},
+    .visibility = {visibility},
+    .buffer = {{
+        .type = wgpu::BufferBindingType::{buffer_type},
+        .minBindingSize = {min_binding_size},
+    }},
+    .sampler = {{
+        .type = wgpu::SamplerBindingType::{sampler_type},
+    }},
+    .texture = {{
+        .sampleType = wgpu::TextureSampleType::{sample_type},
+        .viewDimension = wgpu::TextureViewDimension::{view_dimension if sample_type != 'BindingNotUsed' else 'Undefined'},
+        .multisampled = {'true' if multisampled else 'false'},
+    }},
+    .storageTexture = {{
+        .access = wgpu::StorageTextureAccess::{storage_access},
+        .format = wgpu::TextureFormat::{storage_format},
+        .viewDimension = wgpu::TextureViewDimension::{view_dimension if storage_access != 'BindingNotUsed' else 'Undefined'},
+    }},
+}},
+"""
+
+
+def source_hash(source: str) -> str:
+    # The generator itself is part of the hash, so changing it invalidates every reflected header.
+    with open(__file__, 'rb') as f:
+        generator = f.read()
+    return hashlib.sha256(generator + source.encode()).hexdigest()
+
+
+def generate_reflection_hpp(source: str, file_name: str, namespace: str) -> str:
+    module = parse_wgsl(source)
+    resolver = LayoutResolver(module)
+
+    # Only structs used by buffer bindings are host-shareable, so only those are emitted.
+    used_structs: list[str] = []
+
+    def visit(type_: WgslType):
+        type_ = resolver.resolve(type_)
+        for arg in type_.args:
+            if isinstance(arg, WgslType):
+                visit(arg)
+        if type_.name in module.structs and type_.name not in used_structs:
+            for member in module.structs[type_.name].members:
+                visit(member.type_)
+            used_structs.append(type_.name)
+
+    for binding in module.bindings:
+        if binding.address_space in ['uniform', 'storage']:
+            visit(binding.type_)
+
+    struct_definitions = SourceBuilder()
+    for i, name in enumerate(used_structs):
+        if i != 0: struct_definitions.append('\n')
+        append_struct_definition(struct_definitions, resolver, module.structs[name])
+
+    stages = [s for s in ['vertex', 'fragment', 'compute'] if s in module.stages]
+    groups = sorted(set(b.group for b in module.bindings))
+
+    layout_definitions = SourceBuilder()
+    for i, group in enumerate(groups):
+        if i != 0: layout_definitions.append('\n')
+
+        bindings = sorted([b for b in module.bindings if b.group == group], key=lambda b: b.binding)
+        entries = ''.join(binding_entry(resolver, b, stages) for b in bindings)
+        names = ', '.join(f"`{b.name}`" for b in bindings)
+
+        layout_definitions.append(doc_comment(f"Layout entries of bind group {group}: {names}."))
+        layout_definitions.append(f"constexpr std::array<wgpu::BindGroupLayoutEntry, {len(bindings)}> group{group}LayoutEntries {{ {{\n")
+        layout_definitions.append(indent(1, entries))
+        layout_definitions.append('} };\n')
+
+    return f"""#pragma once
+
+/**
+ * !! THIS FILE IS AUTOMATICALLY GENERATED !!
+ *
+ * Reflected from `{file_name}`. Do not edit this file directly.
+ * See `gen/wgsl.py` for the code that generates this file.
+ **/
+// source-hash: {source_hash(source)}
+
+#include <webgpu/webgpu.hpp>
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+
+namespace {namespace} {{
+
+// -- STRUCTS --
+{struct_definitions}
+// -- BIND GROUP LAYOUTS --
+{layout_definitions}
+}};
+"""
+
+
+def is_up_to_date(source: str, output: str) -> bool:
+    """Whether the given generated header was reflected from the given source."""
+    return f"// source-hash: {source_hash(source)}\n" in output
@@ -0,0 +1,429 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <algorithm>
+#include <array>
+#include <bit>
+#include <chrono>
+#include <cstdint>
+#include <span>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
+namespace wgpu::bundle {
+
+// -- STRUCTS --
+/**
+ * Attachment formats of the render passes a bundle will be executed in.
+ **/
+struct BundleFormat {
+    std::vector<TextureFormat> colorFormats;
+    TextureFormat depthStencilFormat = TextureFormat::Undefined;
+    uint32_t sampleCount = 1;
+    bool depthReadOnly {};
+    bool stencilReadOnly {};
+};
+
+struct BundleStats {
+    /**
+     * Amount of render bundles recorded.
+     **/
+    uint64_t bundlesCreated {};
+    /**
+     * Amount of render bundles executed.
+     **/
+    uint64_t bundlesExecuted {};
+    /**
+     * Amount of draws served from previously recorded bundles.
+     **/
+    uint64_t bundledDraws {};
+    /**
+     * Estimated CPU time saved by executing bundles instead of encoding their draws directly.
+     **/
+    std::chrono::nanoseconds encodingTimeSaved {};
+};
+
+// -- CLASSES --
+/**
+ * A recorded sequence of draw commands, which can be encoded into a pass directly or cached in a bundle.
+ **/
+class DrawList {
+public:
+    void setPipeline(RenderPipeline pipeline) {
+        push(CommandType::SetPipeline, handle(pipeline));
+    }
+
+    void setBindGroup(uint32_t groupIndex, BindGroup group, std::span<uint32_t const> dynamicOffsets = {}) {
+        push(CommandType::SetBindGroup, groupIndex, handle(group), m_dynamicOffsets.size(), dynamicOffsets.size());
+        m_dynamicOffsets.insert(m_dynamicOffsets.end(), dynamicOffsets.begin(), dynamicOffsets.end());
+    }
+
+    void setVertexBuffer(uint32_t slot, Buffer buffer, uint64_t offset = 0, uint64_t size = WGPU_WHOLE_SIZE) {
+        push(CommandType::SetVertexBuffer, slot, handle(buffer), offset, size);
+    }
+
+    void setIndexBuffer(Buffer buffer, IndexFormat format, uint64_t offset = 0, uint64_t size = WGPU_WHOLE_SIZE) {
+        push(CommandType::SetIndexBuffer, handle(buffer), static_cast<uint64_t>(format), offset, size);
+    }
+
+    void draw(uint32_t vertexCount, uint32_t instanceCount = 1, uint32_t firstVertex = 0, uint32_t firstInstance = 0) {
+        push(CommandType::Draw, vertexCount, instanceCount, firstVertex, firstInstance);
+        m_drawCount++;
+    }
+
+    void drawIndexed(uint32_t indexCount, uint32_t instanceCount = 1, uint32_t firstIndex = 0, int32_t baseVertex = 0,
+        uint32_t firstInstance = 0) {
+        push(CommandType::DrawIndexed, indexCount, instanceCount, firstIndex,
+            static_cast<uint32_t>(baseVertex), firstInstance);
+        m_drawCount++;
+    }
+
+    void clear() {
+        m_commands.clear();
+        m_dynamicOffsets.clear();
+        m_drawCount = 0;
+    }
+
+    /**
+     * Encode the recorded commands into a render pass or render bundle encoder.
+     **/
+    template <class Encoder>
+    void encode(Encoder& encoder) const {
+        for (auto const& command : m_commands) {
+            switch (command.type) {
+            case CommandType::SetPipeline:
+                encoder.setPipeline(object<WGPURenderPipeline>(command.args[0]));
+                break;
+            case CommandType::SetBindGroup: {
+                auto offsets = const_cast<uint32_t*>(m_dynamicOffsets.data()) + command.args[2];
+                encoder.setBindGroup(static_cast<uint32_t>(command.args[0]), object<WGPUBindGroup>(command.args[1]),
+                    { static_cast<size_t>(command.args[3]), offsets });
+                break;
+            }
+            case CommandType::SetVertexBuffer:
+                encoder.setVertexBuffer(static_cast<uint32_t>(command.args[0]), object<WGPUBuffer>(command.args[1]),
+                    command.args[2], command.args[3]);
+                break;
+            case CommandType::SetIndexBuffer:
+                encoder.setIndexBuffer(object<WGPUBuffer>(command.args[0]), static_cast<IndexFormat>(command.args[1]),
+                    command.args[2], command.args[3]);
+                break;
+            case CommandType::Draw:
+                encoder.draw(static_cast<uint32_t>(command.args[0]), static_cast<uint32_t>(command.args[1]),
+                    static_cast<uint32_t>(command.args[2]), static_cast<uint32_t>(command.args[3]));
+                break;
+            case CommandType::DrawIndexed:
+                encoder.drawIndexed(static_cast<uint32_t>(command.args[0]), static_cast<uint32_t>(command.args[1]),
+                    static_cast<uint32_t>(command.args[2]), static_cast<int32_t>(command.args[3]),
+                    static_cast<uint32_t>(command.args[4]));
+                break;
+            }
+        }
+    }
+
+    /**
+     * Visit the handle of every object referenced by the recorded commands.
+     **/
+    template <class F>
+    void forEachResource(F&& f) const {
+        for (auto const& command : m_commands) {
+            switch (command.type) {
+            case CommandType::SetPipeline:
+            case CommandType::SetIndexBuffer:
+                f(command.args[0]);
+                break;
+            case CommandType::SetBindGroup:
+            case CommandType::SetVertexBuffer:
+                f(command.args[1]);
+                break;
+            default:
+                break;
+            }
+        }
+    }
+
+    [[nodiscard]] uint64_t hash(uint64_t seed = 0xcbf29ce484222325) const {
+        for (auto const& command : m_commands) {
+            seed = hashValue(seed, static_cast<uint64_t>(command.type));
+            for (auto arg : command.args) {
+                seed = hashValue(seed, arg);
+            }
+        }
+
+        for (auto offset : m_dynamicOffsets) {
+            seed = hashValue(seed, offset);
+        }
+
+        return seed;
+    }
+
+    [[nodiscard]] uint32_t drawCount() const { return m_drawCount; }
+    [[nodiscard]] bool empty() const { return m_commands.empty(); }
+
+    bool operator==(DrawList const&) const = default;
+
+private:
+    friend class BundleCache;
+
+    enum class CommandType : uint32_t {
+        SetPipeline,
+        SetBindGroup,
+        SetVertexBuffer,
+        SetIndexBuffer,
+        Draw,
+        DrawIndexed,
+    };
+
+    struct Command {
+        CommandType type;
+        std::array<uint64_t, 5> args;
+
+        bool operator==(Command const&) const = default;
+    };
+
+    template <class T>
+    static uint64_t handle(T object) {
+        static_assert(sizeof(T) == sizeof(uintptr_t), "object wrappers are a single pointer");
+        return static_cast<uint64_t>(std::bit_cast<uintptr_t>(object));
+    }
+
+    template <class T>
+    static T object(uint64_t handle) {
+        return reinterpret_cast<T>(static_cast<uintptr_t>(handle));
+    }
+
+    static uint64_t hashValue(uint64_t seed, uint64_t value) {
+        // FNV-1a over the bytes of the value.
+        for (int i = 0; i < 8; i++) {
+            seed ^= (value >> (i * 8)) & 0xff;
+            seed *= 0x100000001b3;
+        }
+
+        return seed;
+    }
+
+    void push(CommandType type, uint64_t a = 0, uint64_t b = 0, uint64_t c = 0, uint64_t d = 0, uint64_t e = 0) {
+        m_commands.push_back({ type, { a, b, c, d, e } });
+    }
+
+    std::vector<Command> m_commands;
+    std::vector<uint32_t> m_dynamicOffsets;
+    uint32_t m_drawCount {};
+};
+
+/**
+ * Cache of render bundles recorded from draw lists.
+ *
+ * `execute` looks up a bundle by the recorded command stream and attachment formats. On a miss, the draw list is
+ * recorded into a new bundle through a `RenderBundleEncoder`. Either way, the bundle is replayed with
+ * `executeBundles`. Bundles referencing a resource can be dropped with `invalidate`, and bundles that have not been
+ * executed for a while are dropped by `endFrame`.
+ **/
+class BundleCache {
+public:
+    explicit BundleCache(Device device, uint32_t maxUnusedFrames = 60)
+        : m_device(device), m_maxUnusedFrames(maxUnusedFrames) { }
+
+    ~BundleCache() { clear(); }
+
+    BundleCache(BundleCache&) = delete;
+    BundleCache(BundleCache&&) = delete;
+    BundleCache& operator=(BundleCache&) = delete;
+    BundleCache& operator=(BundleCache&&) = delete;
+
+    /**
+     * Execute the given draw list in the render pass, through a cached bundle.
+     **/
+    void execute(RenderPassEncoder pass, DrawList const& drawList, BundleFormat const& format) {
+        if (drawList.empty()) {
+            return;
+        }
+
+        auto key = formatHash(format, drawList.hash());
+        auto entry = find(key, drawList, format);
+
+        if (entry) {
+            auto start = std::chrono::steady_clock::now();
+            pass.executeBundles({ 1, &entry->bundle });
+            auto executeTime = std::chrono::steady_clock::now() - start;
+
+            m_frameStats.bundledDraws += drawList.drawCount();
+            m_frameStats.encodingTimeSaved += std::max<std::chrono::nanoseconds>(
+                entry->encodeTime - executeTime, std::chrono::nanoseconds::zero());
+        } else {
+            entry = &record(key, drawList, format);
+            pass.executeBundles({ 1, &entry->bundle });
+        }
+
+        entry->lastUsedFrame = m_frame;
+        m_frameStats.bundlesExecuted++;
+    }
+
+    /**
+     * Drop every bundle referencing the given object, for example when it is destroyed or its contents change.
+     **/
+    template <class T>
+    void invalidate(T object) {
+        auto resource = m_resources.find(DrawList::handle(object));
+        if (resource == m_resources.end()) {
+            return;
+        }
+
+        auto entries = std::move(resource->second);
+        m_resources.erase(resource);
+
+        for (auto entry : entries) {
+            auto [begin, end] = m_entries.equal_range(entry->key);
+            for (auto it = begin; it != end; it++) {
+                if (&it->second == entry) {
+                    erase(it);
+                    break;
+                }
+            }
+        }
+    }
+
+    /**
+     * Drop bundles that have not been executed recently, and start collecting the statistics of a new frame.
+     **/
+    void endFrame() {
+        for (auto it = m_entries.begin(); it != m_entries.end();) {
+            if (m_frame - it->second.lastUsedFrame > m_maxUnusedFrames) {
+                it = erase(it);
+            } else {
+                it++;
+            }
+        }
+
+        m_totalStats.bundlesCreated += m_frameStats.bundlesCreated;
+        m_totalStats.bundlesExecuted += m_frameStats.bundlesExecuted;
+        m_totalStats.bundledDraws += m_frameStats.bundledDraws;
+        m_totalStats.encodingTimeSaved += m_frameStats.encodingTimeSaved;
+
+        m_lastFrameStats = std::exchange(m_frameStats, {});
+        m_frame++;
+    }
+
+    /**
+     * Drop every bundle.
+     **/
+    void clear() {
+        for (auto& [_, entry] : m_entries) {
+            entry.bundle.release();
+        }
+
+        m_entries.clear();
+        m_resources.clear();
+    }
+
+    /**
+     * Statistics of the last frame ended with `endFrame`.
+     **/
+    [[nodiscard]] BundleStats const& frameStats() const { return m_lastFrameStats; }
+    [[nodiscard]] BundleStats const& totalStats() const { return m_totalStats; }
+    [[nodiscard]] size_t size() const { return m_entries.size(); }
+
+private:
+    struct Entry {
+        uint64_t key;
+        DrawList drawList;
+        BundleFormat format;
+        RenderBundle bundle;
+        std::chrono::nanoseconds encodeTime;
+        uint64_t lastUsedFrame;
+    };
+
+    using EntryMap = std::unordered_multimap<uint64_t, Entry>;
+
+    static uint64_t formatHash(BundleFormat const& format, uint64_t seed) {
+        for (auto colorFormat : format.colorFormats) {
+            seed = DrawList::hashValue(seed, static_cast<uint64_t>(colorFormat));
+        }
+
+        seed = DrawList::hashValue(seed, static_cast<uint64_t>(format.depthStencilFormat));
+        seed = DrawList::hashValue(seed, format.sampleCount);
+        return DrawList::hashValue(seed, (format.depthReadOnly ? 1 : 0) | (format.stencilReadOnly ? 2 : 0));
+    }
+
+    static bool sameFormat(BundleFormat const& a, BundleFormat const& b) {
+        return a.colorFormats == b.colorFormats
+            && a.depthStencilFormat == b.depthStencilFormat
+            && a.sampleCount == b.sampleCount
+            && a.depthReadOnly == b.depthReadOnly
+            && a.stencilReadOnly == b.stencilReadOnly;
+    }
+
+    Entry* find(uint64_t key, DrawList const& drawList, BundleFormat const& format) {
+        auto [begin, end] = m_entries.equal_range(key);
+        for (auto it = begin; it != end; it++) {
+            // Guard against hash collisions.
+            if (it->second.drawList == drawList && sameFormat(it->second.format, format)) {
+                return &it->second;
+            }
+        }
+
+        return nullptr;
+    }
+
+    Entry& record(uint64_t key, DrawList const& drawList, BundleFormat const& format) {
+        auto colorFormats = format.colorFormats;
+        RenderBundleEncoderDescriptor descriptor {
+            .colorFormats = colorFormats,
+            .depthStencilFormat = format.depthStencilFormat,
+            .sampleCount = format.sampleCount,
+            .depthReadOnly = format.depthReadOnly,
+            .stencilReadOnly = format.stencilReadOnly,
+        };
+
+        auto encoder = m_device.createRenderBundleEncoder(descriptor);
+
+        // Only the draw commands are timed, as that is the work executing the bundle saves compared to encoding
+        // them into the pass directly.
+        auto start = std::chrono::steady_clock::now();
+        drawList.encode(encoder);
+        auto encodeTime = std::chrono::steady_clock::now() - start;
+
+        auto bundle = encoder.finish(nullptr);
+        encoder.release();
+        m_frameStats.bundlesCreated++;
+
+        auto it = m_entries.emplace(key, Entry { key, drawList, format, bundle, encodeTime, m_frame });
+        auto entry = &it->second;
+        drawList.forEachResource([&](uint64_t resource) { m_resources[resource].insert(entry); });
+
+        return *entry;
+    }
+
+    EntryMap::iterator erase(EntryMap::iterator it) {
+        it->second.drawList.forEachResource([&](uint64_t handle) {
+            auto resource = m_resources.find(handle);
+            if (resource != m_resources.end()) {
+                resource->second.erase(&it->second);
+                if (resource->second.empty()) {
+                    m_resources.erase(resource);
+                }
+            }
+        });
+
+        it->second.bundle.release();
+        return m_entries.erase(it);
+    }
+
+    Device m_device;
+    uint32_t m_maxUnusedFrames;
+
+    EntryMap m_entries;
+    // Entries are tracked by address rather than by key, as colliding entries share a key. The multimap is node-based,
+    // so the addresses stay valid until the entry is erased.
+    std::unordered_map<uint64_t, std::unordered_set<Entry*>> m_resources;
+
+    uint64_t m_frame {};
+    BundleStats m_frameStats {};
+    BundleStats m_lastFrameStats {};
+    BundleStats m_totalStats {};
+};
+
+};
@@ -0,0 +1,365 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <span>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace wgpu::parallel {
+
+// -- STRUCTS --
+/**
+ * Per-thread timing counters, accumulated across every `record` call until `resetStats` is called.
+ **/
+struct ThreadStats {
+    /**
+     * Amount of jobs executed on this thread, including stolen ones.
+     **/
+    uint64_t jobsExecuted {};
+    /**
+     * Amount of jobs this thread stole from another thread's queue.
+     **/
+    uint64_t jobsStolen {};
+    /**
+     * Amount of command encoders handed out to jobs on this thread.
+     **/
+    uint64_t encodersCreated {};
+    /**
+     * Time spent inside jobs, including finishing their command encoders.
+     **/
+    std::chrono::nanoseconds recordTime {};
+    /**
+     * Time spent looking for work before running out of jobs to steal.
+     **/
+    std::chrono::nanoseconds idleTime {};
+};
+
+// -- CLASSES --
+/**
+ * Per-thread source of command encoders.
+ *
+ * WebGPU command encoders are single-use, so the pool does not recycle the encoders themselves. Instead, it owns the
+ * descriptor and label used by every encoder created on its thread, and tracks the encoder handed out to the job
+ * currently running so it can be finished once that job returns.
+ **/
+class EncoderPool {
+public:
+    EncoderPool(Device device, std::string label) : m_device(device), m_label(std::move(label)) { }
+
+    /**
+     * Return the encoder of the current job, creating it on first use.
+     **/
+    CommandEncoder acquire() {
+        if (!m_current) {
+            CommandEncoderDescriptor descriptor {
+                .label = m_label,
+            };
+
+            m_current = m_device.createCommandEncoder(&descriptor);
+            m_created++;
+        }
+
+        return m_current;
+    }
+
+    /**
+     * Finish the encoder of the current job, if any, and return the resulting command buffer.
+     **/
+    std::optional<CommandBuffer> finish() {
+        if (!m_current) {
+            return std::nullopt;
+        }
+
+        CommandBufferDescriptor descriptor {
+            .label = m_label,
+        };
+
+        auto commandBuffer = m_current.finish(&descriptor);
+        m_current.release();
+        m_current = {};
+
+        return commandBuffer;
+    }
+
+    [[nodiscard]] uint64_t takeCreatedCount() { return std::exchange(m_created, 0); }
+
+private:
+    Device m_device;
+    std::string m_label;
+
+    CommandEncoder m_current {};
+    uint64_t m_created {};
+};
+
+/**
+ * Handle passed to every job, giving access to the command encoder of the thread the job runs on.
+ **/
+class RecordingContext {
+public:
+    RecordingContext(EncoderPool& pool, uint32_t threadIndex, uint32_t jobIndex)
+        : m_pool(pool), m_threadIndex(threadIndex), m_jobIndex(jobIndex) { }
+
+    /**
+     * Command encoder to record this job's passes into. Every job gets its own encoder, so the resulting
+     * command buffers can be submitted in job order regardless of which thread recorded them.
+     **/
+    CommandEncoder encoder() { return m_pool.acquire(); }
+
+    [[nodiscard]] uint32_t threadIndex() const { return m_threadIndex; }
+    [[nodiscard]] uint32_t jobIndex() const { return m_jobIndex; }
+
+private:
+    EncoderPool& m_pool;
+    uint32_t m_threadIndex;
+    uint32_t m_jobIndex;
+};
+
+using Job = std::function<void(RecordingContext&)>;
+
+/**
+ * Records command buffers on multiple threads using a work-stealing job queue.
+ *
+ * Jobs are added with `addJob`, after which `record` distributes them over the worker threads. Each thread pops jobs
+ * from the back of its own queue, and steals from the front of other queues once it runs dry. The calling thread
+ * participates as thread 0. The resulting command buffers are returned in the order the jobs were added, so a frame
+ * always submits in the same order no matter how the work was scheduled.
+ **/
+class ParallelRecorder {
+public:
+    explicit ParallelRecorder(Device device, uint32_t threadCount = std::thread::hardware_concurrency()) {
+        threadCount = std::max(threadCount, 1u);
+
+        m_workers.reserve(threadCount);
+        for (uint32_t i = 0; i < threadCount; i++) {
+            m_workers.push_back(std::make_unique<Worker>(device, "parallel encoder " + std::to_string(i)));
+        }
+
+        m_stats.resize(threadCount);
+
+        for (uint32_t i = 1; i < threadCount; i++) {
+            m_threads.emplace_back([this, i] { workerLoop(i); });
+        }
+    }
+
+    ~ParallelRecorder() {
+        {
+            std::lock_guard lock(m_mutex);
+            m_stopping = true;
+        }
+
+        m_wake.notify_all();
+        for (auto& thread : m_threads) {
+            thread.join();
+        }
+    }
+
+    ParallelRecorder(ParallelRecorder&) = delete;
+    ParallelRecorder(ParallelRecorder&&) = delete;
+    ParallelRecorder& operator=(ParallelRecorder&) = delete;
+    ParallelRecorder& operator=(ParallelRecorder&&) = delete;
+
+    /**
+     * Queue a job for the next `record` call, returning its index in the resulting command buffer list.
+     **/
+    uint32_t addJob(Job job) {
+        m_jobs.push_back(std::move(job));
+        return static_cast<uint32_t>(m_jobs.size() - 1);
+    }
+
+    /**
+     * Run every queued job and return the recorded command buffers in job order.
+     *
+     * Jobs that never requested an encoder do not produce a command buffer. The caller owns the returned
+     * command buffers, and has to release them after submitting.
+     **/
+    std::vector<CommandBuffer> record() {
+        if (m_jobs.empty()) {
+            return {};
+        }
+
+        m_results.assign(m_jobs.size(), std::nullopt);
+        m_remaining.store(static_cast<uint32_t>(m_jobs.size()), std::memory_order_release);
+
+        // Distribute the jobs round-robin, so every thread starts with an equal share.
+        for (uint32_t i = 0; i < m_jobs.size(); i++) {
+            auto& worker = *m_workers[i % m_workers.size()];
+            std::lock_guard lock(worker.mutex);
+            worker.queue.push_back(i);
+        }
+
+        {
+            std::lock_guard lock(m_mutex);
+            m_generation++;
+        }
+
+        m_wake.notify_all();
+        runJobs(0);
+
+        {
+            std::unique_lock lock(m_mutex);
+            m_done.wait(lock, [this] { return m_remaining.load(std::memory_order_acquire) == 0 && m_active == 0; });
+        }
+
+        m_jobs.clear();
+
+        std::vector<CommandBuffer> commandBuffers;
+        commandBuffers.reserve(m_results.size());
+        for (auto& result : m_results) {
+            if (result) {
+                commandBuffers.push_back(*result);
+            }
+        }
+
+        return commandBuffers;
+    }
+
+    /**
+     * Run every queued job, and submit the recorded command buffers in a single `Queue::submit` call.
+     **/
+    void submit(Queue queue) {
+        auto commandBuffers = record();
+        if (commandBuffers.empty()) {
+            return;
+        }
+
+        queue.submit(commandBuffers);
+        for (auto& commandBuffer : commandBuffers) {
+            commandBuffer.release();
+        }
+    }
+
+    /**
+     * Timing counters for every thread, indexed by thread index.
+     **/
+    [[nodiscard]] std::span<ThreadStats const> stats() const { return m_stats; }
+
+    void resetStats() { std::fill(m_stats.begin(), m_stats.end(), ThreadStats {}); }
+
+    [[nodiscard]] uint32_t threadCount() const { return static_cast<uint32_t>(m_workers.size()); }
+
+private:
+    struct Worker {
+        Worker(Device device, std::string label) : pool(device, std::move(label)) { }
+
+        std::mutex mutex;
+        std::deque<uint32_t> queue;
+        EncoderPool pool;
+    };
+
+    void workerLoop(uint32_t threadIndex) {
+        uint64_t seenGeneration = 0;
+
+        while (true) {
+            {
+                std::unique_lock lock(m_mutex);
+                m_wake.wait(lock, [&] { return m_stopping || m_generation != seenGeneration; });
+                if (m_stopping) {
+                    return;
+                }
+
+                seenGeneration = m_generation;
+                m_active++;
+            }
+
+            runJobs(threadIndex);
+
+            {
+                std::lock_guard lock(m_mutex);
+                m_active--;
+            }
+
+            m_done.notify_all();
+        }
+    }
+
+    void runJobs(uint32_t threadIndex) {
+        auto& worker = *m_workers[threadIndex];
+        auto& stats = m_stats[threadIndex];
+
+        while (m_remaining.load(std::memory_order_acquire) > 0) {
+            auto searchStart = std::chrono::steady_clock::now();
+
+            bool stolen = false;
+            auto jobIndex = popLocal(worker);
+            if (!jobIndex) {
+                jobIndex = steal(threadIndex);
+                stolen = jobIndex.has_value();
+            }
+
+            auto jobStart = std::chrono::steady_clock::now();
+            if (!jobIndex) {
+                // Jobs never queue other jobs, so once every queue is empty there is nothing left to steal. Park
+                // until the next `record` call instead of spinning while other threads finish their last job.
+                stats.idleTime += jobStart - searchStart;
+                return;
+            }
+
+            RecordingContext context(worker.pool, threadIndex, *jobIndex);
+            m_jobs[*jobIndex](context);
+            m_results[*jobIndex] = worker.pool.finish();
+
+            stats.recordTime += std::chrono::steady_clock::now() - jobStart;
+            stats.jobsExecuted++;
+            stats.jobsStolen += stolen ? 1 : 0;
+            stats.encodersCreated += worker.pool.takeCreatedCount();
+
+            m_remaining.fetch_sub(1, std::memory_order_acq_rel);
+        }
+    }
+
+    static std::optional<uint32_t> popLocal(Worker& worker) {
+        std::lock_guard lock(worker.mutex);
+        if (worker.queue.empty()) {
+            return std::nullopt;
+        }
+
+        auto jobIndex = worker.queue.back();
+        worker.queue.pop_back();
+        return jobIndex;
+    }
+
+    std::optional<uint32_t> steal(uint32_t threadIndex) {
+        for (size_t offset = 1; offset < m_workers.size(); offset++) {
+            auto& victim = *m_workers[(threadIndex + offset) % m_workers.size()];
+
+            std::lock_guard lock(victim.mutex);
+            if (!victim.queue.empty()) {
+                auto jobIndex = victim.queue.front();
+                victim.queue.pop_front();
+                return jobIndex;
+            }
+        }
+
+        return std::nullopt;
+    }
+
+    std::vector<std::unique_ptr<Worker>> m_workers;
+    std::vector<ThreadStats> m_stats;
+    std::vector<std::thread> m_threads;
+
+    std::vector<Job> m_jobs;
+    std::vector<std::optional<CommandBuffer>> m_results;
+    std::atomic<uint32_t> m_remaining {};
+
+    std::mutex m_mutex;
+    std::condition_variable m_wake;
+    std::condition_variable m_done;
+    uint64_t m_generation {};
+    uint32_t m_active {};
+    bool m_stopping {};
+};
+
+};
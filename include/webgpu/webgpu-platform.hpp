@@ -3,8 +3,28 @@
 #include <webgpu/webgpu.hpp>
 #include <webgpu/wgpu.h>
 
+#include <algorithm>
+#include <atomic>
+#include <bit>
+#include <chrono>
+#include <condition_variable>
+#include <cstring>
+#include <memory>
+#include <mutex>
+#include <thread>
+
+// With dynamic dispatch, wgpu-native specific functions are resolved through their entry in the dispatch table, like
+// every other function.
+#ifdef WEBGPU_HPP_DYNAMIC_DISPATCH
+#   define WEBGPU_HPP_PLATFORM_PROC(member, name) ::wgpu::dispatch::call(::wgpu::dispatch::table.member, #name)
+#else
+#   define WEBGPU_HPP_PLATFORM_PROC(member, name) ::name
+#endif
+
 namespace wgpu::platform {
 
+typedef WGPUSubmissionIndex SubmissionIndex;
+
 // -- ENUMS --
 enum class LogLevel : uint32_t {
     Off = 0,
@@ -15,20 +35,453 @@ enum class LogLevel : uint32_t {
     Trace = 5,
 };
 
+enum class PollMode : uint32_t {
+    /**
+     * The device is only polled when `PollScheduler::poll` is called, for example once per frame in a game loop.
+     **/
+    Manual = 0,
+    /**
+     * The device is polled on a background thread, which backs off while the device is idle.
+     **/
+    Background = 1,
+};
+
+enum class LogDelivery : uint32_t {
+    /**
+     * Log records are delivered in batches on a consumer thread owned by the sink.
+     **/
+    Thread = 0,
+    /**
+     * Log records are only delivered when `LogSink::drain` is called.
+     **/
+    Manual = 1,
+};
+
 // -- CALLBACKS --
 typedef void (*LogCallback)(LogLevel, StringView, void*);
 
+// -- STRUCTS --
+struct PollSchedulerDescriptor {
+    PollMode mode = PollMode::Background;
+    /**
+     * Interval between background polls while the device is busy.
+     **/
+    std::chrono::microseconds minInterval { 100 };
+    /**
+     * Interval the background thread backs off to while the device is idle.
+     **/
+    std::chrono::microseconds maxInterval { 20'000 };
+};
+
+struct PollStats {
+    /**
+     * Amount of non-blocking polls.
+     **/
+    uint64_t polls {};
+    /**
+     * Amount of non-blocking polls after which the submission queue was empty.
+     **/
+    uint64_t idlePolls {};
+    /**
+     * Amount of blocking waits, through `wait` or `waitIdle`.
+     **/
+    uint64_t waits {};
+    /**
+     * Amount of times the background thread was woken up by `notify`.
+     **/
+    uint64_t wakeups {};
+    /**
+     * Amount of callbacks reported through `PollScheduler::countCallback`.
+     **/
+    uint64_t callbacks {};
+    /**
+     * Time between `notify` being called and the background thread polling, summed over all wakeups.
+     **/
+    std::chrono::nanoseconds totalWakeLatency {};
+    std::chrono::nanoseconds maxWakeLatency {};
+
+    [[nodiscard]] double callbacksPerPoll() const {
+        auto totalPolls = polls + waits;
+        return totalPolls == 0 ? 0.0 : static_cast<double>(callbacks) / static_cast<double>(totalPolls);
+    }
+};
+
+struct LogSinkDescriptor {
+    /**
+     * Most verbose level that is recorded. Anything more verbose is discarded before being copied.
+     **/
+    LogLevel level = LogLevel::Warn;
+    /**
+     * Amount of records the ring buffer can hold. Rounded up to a power of two.
+     **/
+    uint32_t capacity = 1024;
+    LogDelivery delivery = LogDelivery::Thread;
+    /**
+     * Interval at which the consumer thread delivers records.
+     **/
+    std::chrono::milliseconds flushInterval { 10 };
+    /**
+     * Callback records are delivered to, on the consumer thread or the thread calling `drain`.
+     **/
+    LogCallback callback {};
+    void* userdata {};
+};
+
 // -- FUNCTIONS --
 inline void setLogLevel(LogLevel logLevel) {
-    wgpuSetLogLevel(static_cast<WGPULogLevel>(logLevel));
+    WEBGPU_HPP_PLATFORM_PROC(setLogLevel, wgpuSetLogLevel)(static_cast<WGPULogLevel>(logLevel));
 }
 
 inline void setLogCallback(LogCallback callback, void* userdata) {
-    wgpuSetLogCallback(reinterpret_cast<WGPULogCallback>(callback), userdata);
+    WEBGPU_HPP_PLATFORM_PROC(setLogCallback, wgpuSetLogCallback)(reinterpret_cast<WGPULogCallback>(callback), userdata);
+}
+
+/**
+ * Poll the device, optionally blocking until the given submission (or all submissions, if null) has finished.
+ * Returns whether the submission queue is empty.
+ **/
+inline bool pollDevice(Device device, bool wait, SubmissionIndex const* submissionIndex) {
+    return WEBGPU_HPP_PLATFORM_PROC(devicePoll, wgpuDevicePoll)(device, wait, submissionIndex);
+}
+
+/**
+ * Submit the given command buffers, returning the index of the submission for use with `pollDevice`.
+ **/
+inline SubmissionIndex submitForIndex(Queue queue, Array<CommandBuffer> commands) {
+    return WEBGPU_HPP_PLATFORM_PROC(queueSubmitForIndex, wgpuQueueSubmitForIndex)(queue, commands.count, reinterpret_cast<WGPUCommandBuffer const*>(commands.data));
 }
 
 inline void tickDevice(Device device) {
-    wgpuDevicePoll(device, false, nullptr);
+    pollDevice(device, false, nullptr);
 }
 
-};
\ No newline at end of file
+// -- CLASSES --
+/**
+ * Schedules device polls, replacing a `tickDevice` call every frame.
+ *
+ * In `PollMode::Background`, a thread polls the device at `minInterval` while it is busy, and doubles the interval up
+ * to `maxInterval` while it is idle. Calling `notify` (done automatically by `submit`) wakes it up immediately. In
+ * `PollMode::Manual`, the device is only polled by `poll`. In both modes, `wait` blocks until a specific submission
+ * has finished.
+ **/
+class PollScheduler {
+public:
+    explicit PollScheduler(Device device, PollSchedulerDescriptor const& descriptor = {})
+        : m_device(device), m_descriptor(descriptor) {
+        if (m_descriptor.mode == PollMode::Background) {
+            m_thread = std::thread([this] { backgroundLoop(); });
+        }
+    }
+
+    ~PollScheduler() {
+        if (m_thread.joinable()) {
+            {
+                std::lock_guard lock(m_mutex);
+                m_stopping = true;
+            }
+
+            m_wake.notify_one();
+            m_thread.join();
+        }
+    }
+
+    PollScheduler(PollScheduler&) = delete;
+    PollScheduler(PollScheduler&&) = delete;
+    PollScheduler& operator=(PollScheduler&) = delete;
+    PollScheduler& operator=(PollScheduler&&) = delete;
+
+    /**
+     * Poll the device without blocking. Returns whether the submission queue is empty.
+     **/
+    bool poll() {
+        bool idle = pollDevice(m_device, false, nullptr);
+
+        m_polls.fetch_add(1, std::memory_order_relaxed);
+        if (idle) {
+            m_idlePolls.fetch_add(1, std::memory_order_relaxed);
+        }
+
+        return idle;
+    }
+
+    /**
+     * Block until the given submission has finished, dispatching any callbacks on the calling thread.
+     **/
+    void wait(SubmissionIndex submissionIndex) {
+        pollDevice(m_device, true, &submissionIndex);
+        m_waits.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    /**
+     * Block until every submission has finished.
+     **/
+    void waitIdle() {
+        pollDevice(m_device, true, nullptr);
+        m_waits.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    /**
+     * Tell the background thread new work was submitted, so it resumes polling at the minimum interval.
+     **/
+    void notify() {
+        if (!m_thread.joinable()) {
+            return;
+        }
+
+        {
+            std::lock_guard lock(m_mutex);
+            if (!m_notified) {
+                m_notified = true;
+                m_notifyTime = std::chrono::steady_clock::now();
+            }
+        }
+
+        m_wake.notify_one();
+    }
+
+    /**
+     * Submit the given command buffers and wake up the background thread. The returned index can be passed to `wait`.
+     **/
+    SubmissionIndex submit(Queue queue, Array<CommandBuffer> commands) {
+        auto submissionIndex = submitForIndex(queue, commands);
+        notify();
+        return submissionIndex;
+    }
+
+    /**
+     * Count a dispatched callback. Call this from callbacks to have them show up in the statistics.
+     **/
+    void countCallback() {
+        m_callbacks.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    [[nodiscard]] PollStats stats() const {
+        std::lock_guard lock(m_mutex);
+
+        return {
+            .polls = m_polls.load(std::memory_order_relaxed),
+            .idlePolls = m_idlePolls.load(std::memory_order_relaxed),
+            .waits = m_waits.load(std::memory_order_relaxed),
+            .wakeups = m_wakeups,
+            .callbacks = m_callbacks.load(std::memory_order_relaxed),
+            .totalWakeLatency = m_totalWakeLatency,
+            .maxWakeLatency = m_maxWakeLatency,
+        };
+    }
+
+private:
+    void backgroundLoop() {
+        auto interval = m_descriptor.minInterval;
+
+        while (true) {
+            {
+                std::unique_lock lock(m_mutex);
+                m_wake.wait_for(lock, interval, [this] { return m_stopping || m_notified; });
+                if (m_stopping) {
+                    return;
+                }
+
+                if (m_notified) {
+                    auto latency = std::chrono::steady_clock::now() - m_notifyTime;
+                    m_totalWakeLatency += latency;
+                    m_maxWakeLatency = std::max<std::chrono::nanoseconds>(m_maxWakeLatency, latency);
+                    m_wakeups++;
+
+                    m_notified = false;
+                    interval = m_descriptor.minInterval;
+                }
+            }
+
+            bool idle = poll();
+            interval = idle ? std::min(interval * 2, m_descriptor.maxInterval) : m_descriptor.minInterval;
+        }
+    }
+
+    Device m_device;
+    PollSchedulerDescriptor m_descriptor;
+
+    std::atomic<uint64_t> m_polls {};
+    std::atomic<uint64_t> m_idlePolls {};
+    std::atomic<uint64_t> m_waits {};
+    std::atomic<uint64_t> m_callbacks {};
+
+    mutable std::mutex m_mutex;
+    std::condition_variable m_wake;
+    std::thread m_thread;
+    bool m_stopping {};
+    bool m_notified {};
+    std::chrono::steady_clock::time_point m_notifyTime {};
+    uint64_t m_wakeups {};
+    std::chrono::nanoseconds m_totalWakeLatency {};
+    std::chrono::nanoseconds m_maxWakeLatency {};
+};
+
+/**
+ * Asynchronous sink for driver log messages.
+ *
+ * While a sink exists, it is installed as the log callback. Messages above the configured level are discarded right
+ * away, and everything else is copied into a bounded, lock-free ring buffer. The threads logging never block: if the
+ * buffer is full, the message is dropped and counted instead. Records are delivered to the user callback in batches,
+ * either on a consumer thread or when calling `drain`. Messages longer than `MAX_MESSAGE_LENGTH` are truncated.
+ *
+ * Only one sink should exist at a time.
+ **/
+class LogSink {
+public:
+    static constexpr size_t MAX_MESSAGE_LENGTH = 500;
+
+    explicit LogSink(LogSinkDescriptor const& descriptor) : m_descriptor(descriptor) {
+        auto capacity = std::bit_ceil(std::max(m_descriptor.capacity, 2u));
+        m_mask = capacity - 1;
+        m_cells = std::make_unique<Cell[]>(capacity);
+        for (size_t i = 0; i < capacity; i++) {
+            m_cells[i].sequence.store(i, std::memory_order_relaxed);
+        }
+
+        m_level.store(m_descriptor.level, std::memory_order_relaxed);
+        setLogLevel(m_descriptor.level);
+        WEBGPU_HPP_PLATFORM_PROC(setLogCallback, wgpuSetLogCallback)(&LogSink::push, this);
+
+        if (m_descriptor.delivery == LogDelivery::Thread) {
+            m_thread = std::thread([this] { consumerLoop(); });
+        }
+    }
+
+    ~LogSink() {
+        WEBGPU_HPP_PLATFORM_PROC(setLogCallback, wgpuSetLogCallback)(nullptr, nullptr);
+
+        if (m_thread.joinable()) {
+            {
+                std::lock_guard lock(m_mutex);
+                m_stopping = true;
+            }
+
+            m_wake.notify_one();
+            m_thread.join();
+        }
+
+        drain();
+    }
+
+    LogSink(LogSink&) = delete;
+    LogSink(LogSink&&) = delete;
+    LogSink& operator=(LogSink&) = delete;
+    LogSink& operator=(LogSink&&) = delete;
+
+    /**
+     * Deliver every queued record to the callback, returning the amount of records delivered. Only one thread may
+     * drain at a time, so this should not be called when using `LogDelivery::Thread`.
+     **/
+    size_t drain() {
+        size_t delivered = 0;
+
+        while (true) {
+            auto& cell = m_cells[m_dequeuePosition & m_mask];
+            if (cell.sequence.load(std::memory_order_acquire) != m_dequeuePosition + 1) {
+                break;
+            }
+
+            if (m_descriptor.callback) {
+                m_descriptor.callback(cell.level, { cell.length, cell.message }, m_descriptor.userdata);
+            }
+
+            cell.sequence.store(m_dequeuePosition + m_mask + 1, std::memory_order_release);
+            m_dequeuePosition++;
+            delivered++;
+        }
+
+        return delivered;
+    }
+
+    /**
+     * Change the most verbose level that is recorded.
+     **/
+    void setLevel(LogLevel level) {
+        m_level.store(level, std::memory_order_relaxed);
+        setLogLevel(level);
+    }
+
+    /**
+     * Amount of messages dropped because the ring buffer was full.
+     **/
+    [[nodiscard]] uint64_t dropped() const { return m_dropped.load(std::memory_order_relaxed); }
+
+private:
+    struct Cell {
+        std::atomic<size_t> sequence;
+        LogLevel level;
+        uint32_t length;
+        char message[MAX_MESSAGE_LENGTH];
+    };
+
+    static void push(WGPULogLevel level, WGPUStringView message, void* userdata) {
+        auto sink = static_cast<LogSink*>(userdata);
+
+        auto logLevel = static_cast<LogLevel>(level);
+        if (logLevel > sink->m_level.load(std::memory_order_relaxed)) {
+            return;
+        }
+
+        // Claim a cell, as in Dmitry Vyukov's bounded MPMC queue.
+        auto position = sink->m_enqueuePosition.load(std::memory_order_relaxed);
+        Cell* cell;
+        while (true) {
+            cell = &sink->m_cells[position & sink->m_mask];
+            auto sequence = cell->sequence.load(std::memory_order_acquire);
+            auto difference = static_cast<intptr_t>(sequence) - static_cast<intptr_t>(position);
+
+            if (difference == 0) {
+                if (sink->m_enqueuePosition.compare_exchange_weak(position, position + 1, std::memory_order_relaxed)) {
+                    break;
+                }
+            } else if (difference < 0) {
+                sink->m_dropped.fetch_add(1, std::memory_order_relaxed);
+                return;
+            } else {
+                position = sink->m_enqueuePosition.load(std::memory_order_relaxed);
+            }
+        }
+
+        size_t length = message.length == WGPU_STRLEN && message.data ? std::strlen(message.data) : message.length;
+        length = std::min(length, MAX_MESSAGE_LENGTH);
+
+        cell->level = logLevel;
+        cell->length = static_cast<uint32_t>(length);
+        if (length > 0) {
+            std::memcpy(cell->message, message.data, length);
+        }
+
+        cell->sequence.store(position + 1, std::memory_order_release);
+    }
+
+    void consumerLoop() {
+        while (true) {
+            {
+                std::unique_lock lock(m_mutex);
+                if (m_wake.wait_for(lock, m_descriptor.flushInterval, [this] { return m_stopping; })) {
+                    return;
+                }
+            }
+
+            drain();
+        }
+    }
+
+    LogSinkDescriptor m_descriptor;
+
+    std::unique_ptr<Cell[]> m_cells;
+    size_t m_mask {};
+    alignas(64) std::atomic<size_t> m_enqueuePosition {};
+    alignas(64) size_t m_dequeuePosition {};
+    std::atomic<LogLevel> m_level {};
+    std::atomic<uint64_t> m_dropped {};
+
+    std::mutex m_mutex;
+    std::condition_variable m_wake;
+    std::thread m_thread;
+    bool m_stopping {};
+};
+
+};
+
+#undef WEBGPU_HPP_PLATFORM_PROC
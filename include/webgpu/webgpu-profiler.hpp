@@ -0,0 +1,478 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace wgpu::profiler {
+
+// -- STRUCTS --
+struct ProfilerDescriptor {
+    /**
+     * Maximum amount of timed passes per frame. Each timed pass uses two queries.
+     **/
+    uint32_t maxZonesPerFrame = 256;
+    /**
+     * Amount of readback buffers in the ring, and thus the amount of frames results can lag behind.
+     **/
+    uint32_t frameLatency = 3;
+    /**
+     * Multiplier converting raw timestamp values to nanoseconds.
+     **/
+    double timestampPeriod = 1.0;
+};
+
+/**
+ * A single timed zone. Zones without a pass of their own span the time of their children.
+ **/
+struct Zone {
+    std::string name;
+    /**
+     * Index of the parent zone in `FrameTimings::zones`, or -1 for top-level zones.
+     **/
+    int32_t parent = -1;
+    uint32_t depth {};
+    /**
+     * Start and end time in nanoseconds, relative to the first timestamp of the frame.
+     **/
+    uint64_t beginNs {};
+    uint64_t endNs {};
+
+    [[nodiscard]] double durationMs() const { return static_cast<double>(endNs - beginNs) / 1'000'000.0; }
+};
+
+/**
+ * The timing tree of a single frame. Zones are stored in pre-order, so every zone comes after its parent.
+ **/
+struct FrameTimings {
+    uint64_t frameIndex {};
+    std::vector<Zone> zones;
+};
+
+// -- CLASSES --
+class Profiler;
+
+/**
+ * RAII handle for an open zone. The zone is closed when the scope is destroyed.
+ **/
+class [[nodiscard]] Scope {
+public:
+    Scope() = default;
+    Scope(Profiler* profiler, uint64_t frame, uint32_t zone) : m_profiler(profiler), m_frame(frame), m_zone(zone) { }
+    Scope(Scope&& rhs) noexcept
+        : m_profiler(std::exchange(rhs.m_profiler, nullptr)), m_frame(rhs.m_frame), m_zone(rhs.m_zone) { }
+    ~Scope();
+
+    Scope(Scope const&) = delete;
+    Scope& operator=(Scope const&) = delete;
+    Scope& operator=(Scope&&) = delete;
+
+private:
+    Profiler* m_profiler {};
+    uint64_t m_frame {};
+    uint32_t m_zone {};
+};
+
+/**
+ * GPU timestamp profiler using a `QuerySet` and a ring of readback buffers.
+ *
+ * Every frame is bracketed by `beginFrame` and `endFrame`. In between, `zone` opens a scope which injects
+ * `timestampWrites` into the given pass descriptor, and `resolve` records the query resolve and readback copy into an
+ * encoder. `endFrame` has to be called after the encoder has been submitted, and starts mapping that frame's readback
+ * buffer. Mapped results are collected without blocking at the start of later frames, and can be taken with
+ * `takeResults`. If the readback buffer of a frame is still in use, that frame is skipped instead of stalling.
+ *
+ * When the device does not support `FeatureName::TimestampQuery`, every operation is a no-op.
+ **/
+class Profiler {
+public:
+    explicit Profiler(Device device, ProfilerDescriptor const& descriptor = {}) : m_descriptor(descriptor) {
+        m_enabled = device.hasFeature(FeatureName::TimestampQuery);
+        if (!m_enabled) {
+            return;
+        }
+
+        // WebGPU limits query sets to 4096 queries.
+        m_descriptor.maxZonesPerFrame = std::clamp(m_descriptor.maxZonesPerFrame, 1u, 2048u);
+        m_descriptor.frameLatency = std::max(m_descriptor.frameLatency, 1u);
+
+        uint32_t queryCount = m_descriptor.maxZonesPerFrame * 2;
+        uint64_t bufferSize = queryCount * sizeof(uint64_t);
+
+        QuerySetDescriptor querySetDescriptor {
+            .label = "profiler timestamps",
+            .type = QueryType::Timestamp,
+            .count = queryCount,
+        };
+
+        m_querySet = device.createQuerySet(querySetDescriptor);
+
+        for (uint32_t i = 0; i < m_descriptor.frameLatency; i++) {
+            auto slot = std::make_unique<Slot>();
+
+            BufferDescriptor resolveDescriptor {
+                .label = "profiler resolve buffer",
+                .usage = BufferUsage::QueryResolve | BufferUsage::CopySrc,
+                .size = bufferSize,
+            };
+
+            BufferDescriptor readbackDescriptor {
+                .label = "profiler readback buffer",
+                .usage = BufferUsage::MapRead | BufferUsage::CopyDst,
+                .size = bufferSize,
+            };
+
+            slot->resolveBuffer = device.createBuffer(resolveDescriptor);
+            slot->readbackBuffer = device.createBuffer(readbackDescriptor);
+            m_slots.push_back(std::move(slot));
+        }
+    }
+
+    ~Profiler() {
+        for (auto& slot : m_slots) {
+            // Destroying the buffer aborts any pending mapping.
+            slot->readbackBuffer.destroy();
+            slot->readbackBuffer.release();
+            slot->resolveBuffer.release();
+        }
+
+        if (m_querySet) {
+            m_querySet.release();
+        }
+    }
+
+    Profiler(Profiler&) = delete;
+    Profiler(Profiler&&) = delete;
+    Profiler& operator=(Profiler&) = delete;
+    Profiler& operator=(Profiler&&) = delete;
+
+    [[nodiscard]] bool enabled() const { return m_enabled; }
+
+    /**
+     * Collect any finished frames, and start recording a new one.
+     **/
+    void beginFrame() {
+        if (!m_enabled) {
+            return;
+        }
+
+        collect();
+
+        m_current = m_slots[m_frameIndex % m_slots.size()].get();
+        if (m_current->state.load(std::memory_order_acquire) != State::Idle) {
+            // The readback buffer is still in flight, so skip this frame rather than wait for it.
+            m_current = nullptr;
+            m_droppedFrames++;
+        } else {
+            m_current->frameIndex = m_frameIndex;
+            m_current->zones.clear();
+            m_current->queryCount = 0;
+            m_current->state.store(State::Recording, std::memory_order_relaxed);
+        }
+
+        // The timestamp writes are kept alive and reused, as descriptors may still point at them.
+        m_openZones.clear();
+        m_renderWriteCount = 0;
+        m_computeWriteCount = 0;
+        m_frameIndex++;
+    }
+
+    /**
+     * Open a zone which groups the zones opened inside of it.
+     **/
+    Scope zone(StringView name) {
+        if (!m_current) {
+            return {};
+        }
+
+        return { this, m_current->frameIndex, openZone(name, false) };
+    }
+
+    /**
+     * Open a zone timing the render pass created from the given descriptor. If the pass is not timed, because the
+     * frame is skipped or out of queries, `timestampWrites` is reset if it was set by an earlier call.
+     **/
+    Scope zone(StringView name, RenderPassDescriptor& descriptor) {
+        if (!m_current) {
+            resetTimestampWrites(descriptor.timestampWrites, m_renderWrites);
+            return {};
+        }
+
+        auto zone = openZone(name, true);
+        auto& record = m_current->zones[zone];
+        if (record.timed) {
+            descriptor.timestampWrites = &nextTimestampWrites(m_renderWrites, m_renderWriteCount, record);
+        } else {
+            resetTimestampWrites(descriptor.timestampWrites, m_renderWrites);
+        }
+
+        return { this, m_current->frameIndex, zone };
+    }
+
+    /**
+     * Open a zone timing the compute pass created from the given descriptor. If the pass is not timed, because the
+     * frame is skipped or out of queries, `timestampWrites` is reset if it was set by an earlier call.
+     **/
+    Scope zone(StringView name, ComputePassDescriptor& descriptor) {
+        if (!m_current) {
+            resetTimestampWrites(descriptor.timestampWrites, m_computeWrites);
+            return {};
+        }
+
+        auto zone = openZone(name, true);
+        auto& record = m_current->zones[zone];
+        if (record.timed) {
+            descriptor.timestampWrites = &nextTimestampWrites(m_computeWrites, m_computeWriteCount, record);
+        } else {
+            resetTimestampWrites(descriptor.timestampWrites, m_computeWrites);
+        }
+
+        return { this, m_current->frameIndex, zone };
+    }
+
+    /**
+     * Record the query resolve and the copy into this frame's readback buffer. Call this on the last encoder of the
+     * frame, after every timed pass has ended.
+     **/
+    void resolve(CommandEncoder encoder) {
+        if (!m_current || m_current->queryCount == 0) {
+            return;
+        }
+
+        uint64_t size = m_current->queryCount * sizeof(uint64_t);
+        encoder.resolveQuerySet(m_querySet, 0, m_current->queryCount, m_current->resolveBuffer, 0);
+        encoder.copyBufferToBuffer(m_current->resolveBuffer, 0, m_current->readbackBuffer, 0, size);
+    }
+
+    /**
+     * Start mapping this frame's readback buffer. Call this after the encoder passed to `resolve` has been submitted.
+     **/
+    void endFrame() {
+        if (!m_current) {
+            return;
+        }
+
+        auto slot = m_current;
+        m_current = nullptr;
+
+        if (slot->queryCount == 0) {
+            slot->state.store(State::Idle, std::memory_order_release);
+            return;
+        }
+
+        slot->state.store(State::Mapping, std::memory_order_release);
+
+        BufferMapCallbackInfo callbackInfo {
+            .mode = CallbackMode::AllowProcessEvents,
+            .callback = [](MapAsyncStatus status, StringView, void* slotPtr, void*) {
+                auto slot = static_cast<Slot*>(slotPtr);
+                slot->state.store(status == MapAsyncStatus::Success ? State::Mapped : State::Failed,
+                    std::memory_order_release);
+            },
+            .userdata1 = slot,
+        };
+
+        slot->readbackBuffer.mapAsync(MapMode::Read, 0, slot->queryCount * sizeof(uint64_t), callbackInfo);
+    }
+
+    /**
+     * Take the timing trees of every frame collected so far, oldest first.
+     **/
+    [[nodiscard]] std::vector<FrameTimings> takeResults() { return std::exchange(m_results, {}); }
+
+    /**
+     * Amount of frames that were not profiled, because their readback buffer was still in use.
+     **/
+    [[nodiscard]] uint64_t droppedFrames() const { return m_droppedFrames; }
+
+private:
+    friend class Scope;
+
+    enum class State : uint32_t {
+        Idle,
+        Recording,
+        Mapping,
+        Mapped,
+        Failed,
+    };
+
+    struct ZoneRecord {
+        std::string name;
+        int32_t parent;
+        uint32_t depth;
+        bool timed;
+        uint32_t beginQuery;
+    };
+
+    struct Slot {
+        Buffer resolveBuffer {};
+        Buffer readbackBuffer {};
+
+        std::atomic<State> state = State::Idle;
+        uint64_t frameIndex {};
+        std::vector<ZoneRecord> zones;
+        uint32_t queryCount {};
+    };
+
+    uint32_t openZone(StringView name, bool wantsQueries) {
+        bool timed = wantsQueries && m_current->queryCount + 2 <= m_descriptor.maxZonesPerFrame * 2;
+
+        m_current->zones.push_back(ZoneRecord {
+            .name = static_cast<std::string>(name),
+            .parent = m_openZones.empty() ? -1 : static_cast<int32_t>(m_openZones.back()),
+            .depth = static_cast<uint32_t>(m_openZones.size()),
+            .timed = timed,
+            .beginQuery = timed ? m_current->queryCount : 0,
+        });
+
+        if (timed) {
+            m_current->queryCount += 2;
+        }
+
+        auto zone = static_cast<uint32_t>(m_current->zones.size() - 1);
+        m_openZones.push_back(zone);
+        return zone;
+    }
+
+    template <class Writes>
+    Writes& nextTimestampWrites(std::deque<Writes>& storage, size_t& count, ZoneRecord const& record) {
+        if (count == storage.size()) {
+            storage.emplace_back();
+        }
+
+        auto& writes = storage[count++];
+        writes = Writes {
+            .querySet = m_querySet,
+            .beginningOfPassWriteIndex = record.beginQuery,
+            .endOfPassWriteIndex = record.beginQuery + 1,
+        };
+        return writes;
+    }
+
+    template <class Writes>
+    static void resetTimestampWrites(Writes const*& writes, std::deque<Writes> const& storage) {
+        // Only reset writes handed out by this profiler, the caller may have set their own.
+        for (auto& entry : storage) {
+            if (writes == &entry) {
+                writes = nullptr;
+                return;
+            }
+        }
+    }
+
+    void closeZone(uint64_t frame, uint32_t zone) {
+        // Zones opened in a frame that has since ended are ignored.
+        if (!m_current || m_current->frameIndex != frame) {
+            return;
+        }
+
+        auto it = std::find(m_openZones.begin(), m_openZones.end(), zone);
+        if (it != m_openZones.end()) {
+            m_openZones.erase(it, m_openZones.end());
+        }
+    }
+
+    void collect() {
+        for (size_t i = 0; i < m_slots.size(); i++) {
+            // Start from the oldest slot, so results are collected in frame order.
+            auto& slot = *m_slots[(m_frameIndex + i) % m_slots.size()];
+
+            auto state = slot.state.load(std::memory_order_acquire);
+            if (state == State::Failed) {
+                slot.state.store(State::Idle, std::memory_order_relaxed);
+            } else if (state == State::Mapped) {
+                auto timestamps = static_cast<uint64_t const*>(
+                    slot.readbackBuffer.getConstMappedRange(0, slot.queryCount * sizeof(uint64_t)));
+                m_results.push_back(buildTimings(slot, timestamps));
+
+                slot.readbackBuffer.unmap();
+                slot.state.store(State::Idle, std::memory_order_relaxed);
+            }
+        }
+    }
+
+    [[nodiscard]] FrameTimings buildTimings(Slot const& slot, uint64_t const* timestamps) const {
+        FrameTimings timings {
+            .frameIndex = slot.frameIndex,
+        };
+
+        uint64_t base = UINT64_MAX;
+        for (auto const& record : slot.zones) {
+            if (record.timed) {
+                base = std::min(base, timestamps[record.beginQuery]);
+            }
+        }
+
+        timings.zones.reserve(slot.zones.size());
+        for (auto const& record : slot.zones) {
+            Zone zone {
+                .name = record.name,
+                .parent = record.parent,
+                .depth = record.depth,
+                .beginNs = UINT64_MAX,
+            };
+
+            if (record.timed) {
+                zone.beginNs = toNanoseconds(timestamps[record.beginQuery] - base);
+                zone.endNs = toNanoseconds(timestamps[record.beginQuery + 1] - base);
+            }
+
+            timings.zones.push_back(std::move(zone));
+        }
+
+        // Zones are stored in pre-order, so walking backwards visits every child before its parent.
+        for (size_t i = timings.zones.size(); i-- > 0;) {
+            auto& zone = timings.zones[i];
+            if (zone.beginNs == UINT64_MAX) {
+                // A grouping zone without any timed children.
+                zone.beginNs = 0;
+                continue;
+            }
+
+            if (zone.parent >= 0 && !slot.zones[zone.parent].timed) {
+                auto& parent = timings.zones[zone.parent];
+                parent.beginNs = std::min(parent.beginNs, zone.beginNs);
+                parent.endNs = std::max(parent.endNs, zone.endNs);
+            }
+        }
+
+        return timings;
+    }
+
+    [[nodiscard]] uint64_t toNanoseconds(uint64_t ticks) const {
+        return static_cast<uint64_t>(static_cast<double>(ticks) * m_descriptor.timestampPeriod);
+    }
+
+    ProfilerDescriptor m_descriptor;
+    bool m_enabled {};
+
+    QuerySet m_querySet {};
+    std::vector<std::unique_ptr<Slot>> m_slots;
+
+    Slot* m_current {};
+    uint64_t m_frameIndex {};
+    uint64_t m_droppedFrames {};
+
+    std::vector<uint32_t> m_openZones;
+    std::deque<RenderPassTimestampWrites> m_renderWrites;
+    std::deque<ComputePassTimestampWrites> m_computeWrites;
+    size_t m_renderWriteCount {};
+    size_t m_computeWriteCount {};
+
+    std::vector<FrameTimings> m_results;
+};
+
+inline Scope::~Scope() {
+    if (m_profiler) {
+        m_profiler->closeZone(m_frame, m_zone);
+    }
+}
+
+};
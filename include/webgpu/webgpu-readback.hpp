@@ -0,0 +1,279 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <span>
+#include <vector>
+
+namespace wgpu::readback {
+
+// -- STRUCTS --
+struct ReadbackRingDescriptor {
+    /**
+     * Size of every readback buffer, and thus the maximum size of a single readback.
+     **/
+    uint64_t bufferSize = 64 * 1024;
+    /**
+     * Amount of readback buffers in the ring, and thus the maximum amount of readbacks in flight.
+     **/
+    uint32_t capacity = 8;
+};
+
+// -- CLASSES --
+class ReadbackRing;
+
+/**
+ * Handle to a single readback. Tickets are cheap to copy, and become stale once released.
+ **/
+class Ticket {
+public:
+    constexpr Ticket() = default;
+    constexpr Ticket(ReadbackRing* ring, uint32_t slot, uint32_t generation)
+        : m_ring(ring), m_slot(slot), m_generation(generation) { }
+
+    constexpr operator bool() const { return !!m_ring; }
+
+    /**
+     * Whether the data has been mapped, and can be read through `data`.
+     **/
+    [[nodiscard]] bool ready() const;
+    /**
+     * Whether mapping failed. Failed tickets still have to be released.
+     **/
+    [[nodiscard]] bool failed() const;
+
+    /**
+     * The mapped data, or an empty span if the ticket is not ready. The span is valid until the ticket is released.
+     **/
+    template <class T = std::byte>
+    [[nodiscard]] std::span<T const> data() const {
+        auto bytes = rawData();
+        return { reinterpret_cast<T const*>(bytes.data()), bytes.size() / sizeof(T) };
+    }
+
+    /**
+     * Unmap the buffer, returning it to the ring.
+     **/
+    void release();
+
+private:
+    [[nodiscard]] std::span<std::byte const> rawData() const;
+
+    ReadbackRing* m_ring {};
+    uint32_t m_slot {};
+    uint32_t m_generation {};
+};
+
+/**
+ * Ring of `MapRead` buffers for reading back GPU data without blocking.
+ *
+ * `enqueue` records a copy into a free readback buffer and returns a ticket. After the encoder has been submitted,
+ * `flush` starts mapping every buffer copied since the last flush. `collect` then processes finished mappings, and
+ * should be called once per frame. Once a ticket is ready, its data can be read in-place, and releasing the ticket
+ * unmaps the buffer so it can be reused immediately.
+ *
+ * Mappings only finish once the device has been polled, so make sure something polls it, like `tickDevice` or a
+ * `wgpu::platform::PollScheduler`. `Instance::waitAny` is not implemented by wgpu-native, so mappings are collected
+ * with `Instance::processEvents`.
+ **/
+class ReadbackRing {
+public:
+    ReadbackRing(Instance instance, Device device, ReadbackRingDescriptor const& descriptor = {})
+        : m_instance(instance), m_descriptor(descriptor) {
+        for (uint32_t i = 0; i < m_descriptor.capacity; i++) {
+            auto slot = std::make_unique<Slot>();
+
+            BufferDescriptor bufferDescriptor {
+                .label = "readback buffer",
+                .usage = BufferUsage::MapRead | BufferUsage::CopyDst,
+                .size = m_descriptor.bufferSize,
+            };
+
+            slot->buffer = device.createBuffer(bufferDescriptor);
+            m_slots.push_back(std::move(slot));
+            m_free.push_back(m_descriptor.capacity - i - 1);
+        }
+    }
+
+    ~ReadbackRing() {
+        for (auto& slot : m_slots) {
+            // Destroying the buffer aborts any pending mapping.
+            slot->buffer.destroy();
+            slot->buffer.release();
+        }
+    }
+
+    ReadbackRing(ReadbackRing&) = delete;
+    ReadbackRing(ReadbackRing&&) = delete;
+    ReadbackRing& operator=(ReadbackRing&) = delete;
+    ReadbackRing& operator=(ReadbackRing&&) = delete;
+
+    /**
+     * Record a copy of `size` bytes from `source` into a free readback buffer. The offset and size have to be multiples
+     * of 4. Returns an empty ticket if every buffer is in use, or the size exceeds the buffer size.
+     **/
+    Ticket enqueue(CommandEncoder encoder, Buffer source, uint64_t offset, uint64_t size) {
+        if (m_free.empty() || size == 0 || size > m_descriptor.bufferSize) {
+            return {};
+        }
+
+        auto index = m_free.back();
+        m_free.pop_back();
+
+        auto& slot = *m_slots[index];
+        slot.size = size;
+        slot.state.store(State::Copied, std::memory_order_relaxed);
+        encoder.copyBufferToBuffer(source, offset, slot.buffer, 0, size);
+
+        m_copied.push_back(index);
+        return { this, index, slot.generation };
+    }
+
+    /**
+     * Start mapping every buffer copied since the last flush. Call this after submitting the encoders passed to
+     * `enqueue`.
+     **/
+    void flush() {
+        for (auto index : m_copied) {
+            auto& slot = *m_slots[index];
+            slot.state.store(State::Mapping, std::memory_order_relaxed);
+
+            BufferMapCallbackInfo callbackInfo {
+                .mode = CallbackMode::AllowProcessEvents,
+                .callback = [](MapAsyncStatus status, StringView, void* slotPtr, void*) {
+                    auto slot = static_cast<Slot*>(slotPtr);
+                    slot->state.store(status == MapAsyncStatus::Success ? State::Mapped : State::Failed,
+                        std::memory_order_release);
+                },
+                .userdata1 = &slot,
+            };
+
+            slot.buffer.mapAsync(MapMode::Read, 0, slot.size, callbackInfo);
+            m_mapping.push_back(index);
+        }
+
+        m_copied.clear();
+    }
+
+    /**
+     * Process finished mappings with a single, non-blocking `Instance::processEvents` call.
+     **/
+    void collect() {
+        if (m_mapping.empty()) {
+            return;
+        }
+
+        m_instance.processEvents();
+
+        std::erase_if(m_mapping, [this](uint32_t index) {
+            auto& slot = *m_slots[index];
+            if (slot.state.load(std::memory_order_acquire) == State::Mapping) {
+                return false;
+            }
+
+            if (slot.abandoned) {
+                free(index);
+            }
+
+            return true;
+        });
+    }
+
+    /**
+     * Amount of readback buffers that are not in use.
+     **/
+    [[nodiscard]] size_t available() const { return m_free.size(); }
+
+private:
+    friend class Ticket;
+
+    enum class State : uint32_t {
+        Free,
+        Copied,
+        Mapping,
+        Mapped,
+        Failed,
+    };
+
+    struct Slot {
+        Buffer buffer {};
+        uint64_t size {};
+        uint32_t generation {};
+        bool abandoned {};
+        std::atomic<State> state = State::Free;
+    };
+
+    [[nodiscard]] Slot* find(uint32_t index, uint32_t generation) const {
+        auto slot = m_slots[index].get();
+        return slot->generation == generation ? slot : nullptr;
+    }
+
+    void release(uint32_t index, uint32_t generation) {
+        auto slot = find(index, generation);
+        if (!slot) {
+            return;
+        }
+
+        auto state = slot->state.load(std::memory_order_acquire);
+        if (state == State::Copied || state == State::Mapping) {
+            // The buffer is still in use, so it is freed by `collect` once its mapping finishes.
+            slot->abandoned = true;
+            return;
+        }
+
+        free(index);
+    }
+
+    void free(uint32_t index) {
+        auto& slot = *m_slots[index];
+        if (slot.state.load(std::memory_order_acquire) == State::Mapped) {
+            slot.buffer.unmap();
+        }
+
+        slot.generation++;
+        slot.abandoned = false;
+        slot.state.store(State::Free, std::memory_order_relaxed);
+        m_free.push_back(index);
+    }
+
+    Instance m_instance;
+    ReadbackRingDescriptor m_descriptor;
+
+    std::vector<std::unique_ptr<Slot>> m_slots;
+    std::vector<uint32_t> m_free;
+    std::vector<uint32_t> m_copied;
+    std::vector<uint32_t> m_mapping;
+};
+
+inline bool Ticket::ready() const {
+    auto slot = m_ring ? m_ring->find(m_slot, m_generation) : nullptr;
+    return slot && slot->state.load(std::memory_order_acquire) == ReadbackRing::State::Mapped;
+}
+
+inline bool Ticket::failed() const {
+    auto slot = m_ring ? m_ring->find(m_slot, m_generation) : nullptr;
+    return slot && slot->state.load(std::memory_order_acquire) == ReadbackRing::State::Failed;
+}
+
+inline std::span<std::byte const> Ticket::rawData() const {
+    if (!ready()) {
+        return {};
+    }
+
+    auto& slot = *m_ring->m_slots[m_slot];
+    auto data = slot.buffer.getConstMappedRange(0, slot.size);
+    return { static_cast<std::byte const*>(data), slot.size };
+}
+
+inline void Ticket::release() {
+    if (m_ring) {
+        m_ring->release(m_slot, m_generation);
+        m_ring = nullptr;
+    }
+}
+
+};
@@ -0,0 +1,532 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <algorithm>
+#include <cctype>
+#include <chrono>
+#include <cstdint>
+#include <filesystem>
+#include <fstream>
+#include <mutex>
+#include <sstream>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
+namespace wgpu::shader {
+
+// -- STRUCTS --
+/**
+ * Preprocessor defines, as name-value pairs. Every whole-word occurrence of a name is replaced by its value, and names
+ * can be tested with `#ifdef` and `#ifndef`.
+ **/
+using Defines = std::vector<std::pair<std::string, std::string>>;
+
+struct ShaderCacheDescriptor {
+    /**
+     * Directories searched for `#include` files that are not found next to the including file.
+     **/
+    std::vector<std::filesystem::path> includePaths;
+    /**
+     * Directory to keep the persistent index and preprocessed sources in. Leave empty to disable persistence.
+     **/
+    std::filesystem::path cacheDirectory;
+};
+
+struct CacheStats {
+    /**
+     * Amount of acquired modules that were already compiled.
+     **/
+    uint64_t hits {};
+    /**
+     * Amount of acquired modules that had to be compiled.
+     **/
+    uint64_t misses {};
+    /**
+     * Amount of permutations loaded from the on-disk cache instead of being preprocessed.
+     **/
+    uint64_t diskHits {};
+    /**
+     * Amount of permutations that had to be preprocessed.
+     **/
+    uint64_t preprocessed {};
+    std::chrono::nanoseconds preprocessTime {};
+    std::chrono::nanoseconds compileTime {};
+};
+
+// -- FUNCTIONS --
+/**
+ * 64-bit FNV-1a hash, used to key shader sources and permutations.
+ **/
+inline uint64_t hash(std::string_view data, uint64_t seed = 0xcbf29ce484222325) {
+    for (auto c : data) {
+        seed ^= static_cast<uint8_t>(c);
+        seed *= 0x100000001b3;
+    }
+
+    return seed;
+}
+
+// -- CLASSES --
+/**
+ * Cache for shader modules compiled from WGSL files.
+ *
+ * Files are preprocessed before compiling: `#include "file.wgsl"` pastes the given file (at most once per module), and
+ * `#ifdef`, `#ifndef`, `#else` and `#endif` test the given defines. Permutations are keyed by the hash of their path
+ * and defines, and modules by the hash of their final source. Identical modules are deduplicated in memory, and
+ * reference-counted through `acquire` and `release`.
+ *
+ * Every permutation remembers the files it depends on. As long as none of those files change, acquiring it again skips
+ * preprocessing entirely. When a cache directory is set, this index and the preprocessed sources are also kept on disk,
+ * so unchanged permutations are not preprocessed on warm starts either.
+ **/
+class ShaderCache {
+public:
+    ShaderCache(Device device, ShaderCacheDescriptor descriptor) : m_device(device), m_descriptor(std::move(descriptor)) {
+        if (!m_descriptor.cacheDirectory.empty()) {
+            loadIndex();
+        }
+    }
+
+    ~ShaderCache() {
+        if (!m_descriptor.cacheDirectory.empty()) {
+            saveIndex();
+        }
+
+        for (auto& [_, module] : m_modules) {
+            module.module.release();
+        }
+    }
+
+    ShaderCache(ShaderCache&) = delete;
+    ShaderCache(ShaderCache&&) = delete;
+    ShaderCache& operator=(ShaderCache&) = delete;
+    ShaderCache& operator=(ShaderCache&&) = delete;
+
+    /**
+     * Return the shader module for the given file and defines, compiling it if needed. Returns an empty module if
+     * the file, or any file it includes, could not be read.
+     *
+     * Every acquired module has to be returned with `release`.
+     **/
+    ShaderModule acquire(std::filesystem::path const& path, Defines const& defines = {}) {
+        std::lock_guard lock(m_mutex);
+
+        std::error_code error;
+        auto canonicalPath = std::filesystem::weakly_canonical(path, error);
+        if (error) {
+            return {};
+        }
+
+        auto key = permutationKey(canonicalPath, defines);
+
+        std::string source;
+        uint64_t sourceHash {};
+
+        auto indexEntry = m_index.find(key);
+        if (indexEntry != m_index.end() && isUpToDate(indexEntry->second)) {
+            sourceHash = indexEntry->second.sourceHash;
+
+            // The module may still be alive, in which case we never need the source.
+            if (auto module = m_modules.find(sourceHash); module != m_modules.end()) {
+                m_stats.hits++;
+                module->second.references++;
+                return module->second.module;
+            }
+
+            if (readFile(sourcePath(sourceHash), source)) {
+                m_stats.diskHits++;
+            } else {
+                indexEntry = m_index.end();
+            }
+        } else {
+            indexEntry = m_index.end();
+        }
+
+        if (indexEntry == m_index.end()) {
+            auto start = std::chrono::steady_clock::now();
+
+            IndexEntry entry;
+            std::unordered_set<std::string> included;
+            if (!preprocess(canonicalPath, defines, source, included, entry.dependencies)) {
+                return {};
+            }
+
+            // Defines are already applied to the preprocessed source, so permutations that end up identical share
+            // a module.
+            sourceHash = hash(source);
+            entry.sourceHash = sourceHash;
+
+            m_stats.preprocessed++;
+            m_stats.preprocessTime += std::chrono::steady_clock::now() - start;
+
+            if (!m_descriptor.cacheDirectory.empty()) {
+                writeFile(sourcePath(sourceHash), source);
+            }
+
+            m_index.insert_or_assign(key, std::move(entry));
+        }
+
+        // Different permutations can preprocess to the same source.
+        if (auto module = m_modules.find(sourceHash); module != m_modules.end()) {
+            m_stats.hits++;
+            module->second.references++;
+            return module->second.module;
+        }
+
+        auto start = std::chrono::steady_clock::now();
+
+        ShaderSourceWGSL shaderSource {
+            .code = source,
+        };
+
+        auto label = canonicalPath.string();
+        ShaderModuleDescriptor shaderModuleDescriptor {
+            .next = &shaderSource.chain,
+            .label = label,
+        };
+
+        auto module = m_device.createShaderModule(shaderModuleDescriptor);
+
+        m_stats.misses++;
+        m_stats.compileTime += std::chrono::steady_clock::now() - start;
+
+        m_modules.emplace(sourceHash, ModuleEntry { module, 1 });
+        m_moduleHashes.emplace(static_cast<WGPUShaderModule>(module), sourceHash);
+        return module;
+    }
+
+    /**
+     * Return a module acquired through `acquire`, releasing it once nothing references it anymore.
+     **/
+    void release(ShaderModule module) {
+        std::lock_guard lock(m_mutex);
+
+        auto moduleHash = m_moduleHashes.find(static_cast<WGPUShaderModule>(module));
+        if (moduleHash == m_moduleHashes.end()) {
+            return;
+        }
+
+        auto entry = m_modules.find(moduleHash->second);
+        if (--entry->second.references == 0) {
+            entry->second.module.release();
+            m_modules.erase(entry);
+            m_moduleHashes.erase(moduleHash);
+        }
+    }
+
+    /**
+     * Write the permutation index to the cache directory. This is also done automatically on destruction.
+     **/
+    void saveIndex() {
+        std::lock_guard lock(m_mutex);
+
+        std::ostringstream out;
+        out << INDEX_HEADER << '\n';
+        for (auto const& [key, entry] : m_index) {
+            out << "entry " << key << ' ' << entry.sourceHash << ' ' << entry.dependencies.size() << '\n';
+            for (auto const& dependency : entry.dependencies) {
+                out << "dep " << dependency.modifiedTime << ' ' << dependency.size << ' ' << dependency.path << '\n';
+            }
+        }
+
+        writeFile(m_descriptor.cacheDirectory / "index.txt", out.str());
+    }
+
+    [[nodiscard]] CacheStats stats() const {
+        std::lock_guard lock(m_mutex);
+        return m_stats;
+    }
+
+private:
+    static constexpr std::string_view INDEX_HEADER = "webgpu-hpp shader index 1";
+
+    struct Dependency {
+        std::string path;
+        int64_t modifiedTime;
+        uintmax_t size;
+    };
+
+    struct IndexEntry {
+        uint64_t sourceHash {};
+        std::vector<Dependency> dependencies;
+    };
+
+    struct ModuleEntry {
+        ShaderModule module;
+        uint32_t references;
+    };
+
+    struct Fragment {
+        int64_t modifiedTime {};
+        uintmax_t size {};
+        std::string source;
+    };
+
+    static uint64_t permutationKey(std::filesystem::path const& path, Defines const& defines) {
+        return hash(defineString(defines), hash(path.string()));
+    }
+
+    static std::string defineString(Defines const& defines) {
+        std::string out;
+        for (auto const& [name, value] : defines) {
+            out += name;
+            out += '=';
+            out += value;
+            out += '\n';
+        }
+
+        return out;
+    }
+
+    static bool statFile(std::filesystem::path const& path, int64_t& modifiedTime, uintmax_t& size) {
+        std::error_code error;
+        auto time = std::filesystem::last_write_time(path, error);
+        if (error) {
+            return false;
+        }
+
+        size = std::filesystem::file_size(path, error);
+        modifiedTime = time.time_since_epoch().count();
+        return !error;
+    }
+
+    static bool readFile(std::filesystem::path const& path, std::string& out) {
+        std::ifstream file(path, std::ios::binary);
+        if (!file) {
+            return false;
+        }
+
+        std::ostringstream stream;
+        stream << file.rdbuf();
+        out = stream.str();
+        return true;
+    }
+
+    void writeFile(std::filesystem::path const& path, std::string_view data) const {
+        std::error_code error;
+        std::filesystem::create_directories(m_descriptor.cacheDirectory, error);
+
+        std::ofstream file(path, std::ios::binary | std::ios::trunc);
+        file.write(data.data(), static_cast<std::streamsize>(data.size()));
+    }
+
+    [[nodiscard]] std::filesystem::path sourcePath(uint64_t sourceHash) const {
+        if (m_descriptor.cacheDirectory.empty()) {
+            return {};
+        }
+
+        return m_descriptor.cacheDirectory / (std::to_string(sourceHash) + ".wgsl");
+    }
+
+    static bool isUpToDate(IndexEntry const& entry) {
+        for (auto const& dependency : entry.dependencies) {
+            int64_t modifiedTime;
+            uintmax_t size;
+            if (!statFile(dependency.path, modifiedTime, size)
+                || modifiedTime != dependency.modifiedTime
+                || size != dependency.size) {
+                return false;
+            }
+        }
+
+        return true;
+    }
+
+    void loadIndex() {
+        std::string data;
+        if (!readFile(m_descriptor.cacheDirectory / "index.txt", data)) {
+            return;
+        }
+
+        std::istringstream in(data);
+        std::string line;
+        if (!std::getline(in, line) || line != INDEX_HEADER) {
+            return;
+        }
+
+        std::string tag;
+        uint64_t key;
+        IndexEntry entry;
+        size_t dependencyCount;
+        while (in >> tag >> key >> entry.sourceHash >> dependencyCount && tag == "entry") {
+            entry.dependencies.resize(dependencyCount);
+            for (auto& dependency : entry.dependencies) {
+                in >> tag >> dependency.modifiedTime >> dependency.size;
+                in.ignore(1);
+                std::getline(in, dependency.path);
+            }
+
+            if (!in) {
+                break;
+            }
+
+            m_index.insert_or_assign(key, entry);
+        }
+    }
+
+    /**
+     * Return the contents of the given file, re-reading it only if it changed since the last time.
+     **/
+    Fragment const* loadFragment(std::filesystem::path const& path) {
+        int64_t modifiedTime;
+        uintmax_t size;
+        if (!statFile(path, modifiedTime, size)) {
+            return nullptr;
+        }
+
+        auto& fragment = m_fragments[path.string()];
+        if (fragment.modifiedTime != modifiedTime || fragment.size != size || fragment.source.empty()) {
+            if (!readFile(path, fragment.source)) {
+                m_fragments.erase(path.string());
+                return nullptr;
+            }
+
+            fragment.modifiedTime = modifiedTime;
+            fragment.size = size;
+        }
+
+        return &fragment;
+    }
+
+    [[nodiscard]] std::filesystem::path resolveInclude(std::filesystem::path const& from, std::string_view name) const {
+        std::error_code error;
+
+        auto local = from.parent_path() / name;
+        if (std::filesystem::exists(local, error)) {
+            return std::filesystem::weakly_canonical(local, error);
+        }
+
+        for (auto const& includePath : m_descriptor.includePaths) {
+            auto candidate = includePath / name;
+            if (std::filesystem::exists(candidate, error)) {
+                return std::filesystem::weakly_canonical(candidate, error);
+            }
+        }
+
+        return {};
+    }
+
+    bool preprocess(std::filesystem::path const& path, Defines const& defines, std::string& out,
+        std::unordered_set<std::string>& included, std::vector<Dependency>& dependencies) {
+        if (!included.insert(path.string()).second) {
+            return true;
+        }
+
+        auto fragment = loadFragment(path);
+        if (!fragment) {
+            return false;
+        }
+
+        dependencies.push_back({ path.string(), fragment->modifiedTime, fragment->size });
+
+        auto const& source = fragment->source;
+
+        // Every entry is whether the lines inside the conditional block are emitted.
+        std::vector<bool> active;
+        auto isActive = [&] { return active.empty() || active.back(); };
+        auto isDefined = [&](std::string_view name) {
+            return std::any_of(defines.begin(), defines.end(), [&](auto const& define) { return define.first == name; });
+        };
+
+        std::string_view remaining = source;
+        while (!remaining.empty()) {
+            auto end = remaining.find('\n');
+            auto line = remaining.substr(0, end);
+            remaining = end == std::string_view::npos ? std::string_view {} : remaining.substr(end + 1);
+
+            auto directive = line.substr(std::min(line.find_first_not_of(" \t"), line.size()));
+            if (!directive.starts_with('#')) {
+                if (isActive()) {
+                    appendLine(out, line, defines);
+                }
+
+                continue;
+            }
+
+            auto argument = [&](size_t length) {
+                auto rest = directive.substr(length);
+                auto start = std::min(rest.find_first_not_of(" \t"), rest.size());
+                auto stop = rest.find_last_not_of(" \t\r");
+                return stop == std::string_view::npos ? std::string_view {} : rest.substr(start, stop + 1 - start);
+            };
+
+            if (directive.starts_with("#include")) {
+                if (!isActive()) {
+                    continue;
+                }
+
+                auto name = argument(8);
+                if (name.size() < 2 || name.front() != '"' || name.back() != '"') {
+                    return false;
+                }
+
+                auto includePath = resolveInclude(path, name.substr(1, name.size() - 2));
+                if (includePath.empty() || !preprocess(includePath, defines, out, included, dependencies)) {
+                    return false;
+                }
+            } else if (directive.starts_with("#ifdef")) {
+                active.push_back(isActive() && isDefined(argument(6)));
+            } else if (directive.starts_with("#ifndef")) {
+                active.push_back(isActive() && !isDefined(argument(7)));
+            } else if (directive.starts_with("#else")) {
+                if (active.empty()) {
+                    return false;
+                }
+
+                bool parentActive = active.size() < 2 || active[active.size() - 2];
+                active.back() = parentActive && !active.back();
+            } else if (directive.starts_with("#endif")) {
+                if (active.empty()) {
+                    return false;
+                }
+
+                active.pop_back();
+            } else if (isActive()) {
+                appendLine(out, line, defines);
+            }
+        }
+
+        return active.empty();
+    }
+
+    static void appendLine(std::string& out, std::string_view line, Defines const& defines) {
+        auto isIdentifier = [](char c) { return std::isalnum(static_cast<unsigned char>(c)) || c == '_'; };
+
+        size_t i = 0;
+        while (i < line.size()) {
+            if (!isIdentifier(line[i])) {
+                out += line[i++];
+                continue;
+            }
+
+            auto start = i;
+            while (i < line.size() && isIdentifier(line[i])) {
+                i++;
+            }
+
+            auto word = line.substr(start, i - start);
+            auto define = std::find_if(defines.begin(), defines.end(), [&](auto const& d) { return d.first == word; });
+            out += define != defines.end() && !define->second.empty() ? std::string_view(define->second) : word;
+        }
+
+        out += '\n';
+    }
+
+    Device m_device;
+    ShaderCacheDescriptor m_descriptor;
+
+    mutable std::mutex m_mutex;
+    CacheStats m_stats {};
+
+    std::unordered_map<uint64_t, IndexEntry> m_index;
+    std::unordered_map<std::string, Fragment> m_fragments;
+    std::unordered_map<uint64_t, ModuleEntry> m_modules;
+    std::unordered_map<WGPUShaderModule, uint64_t> m_moduleHashes;
+};
+
+};
@@ -0,0 +1,373 @@
+#pragma once
+
+#include <webgpu/webgpu.hpp>
+
+#include <concepts>
+#include <cstddef>
+#include <cstdint>
+#include <span>
+#include <utility>
+#include <vector>
+
+namespace wgpu::slotmap {
+
+/**
+ * Any generated object class, such as `wgpu::Buffer` or `wgpu::Texture`.
+ **/
+template <class T>
+concept Object = std::default_initializable<T> && std::copyable<T> && requires(T object) {
+    object.release();
+    { static_cast<bool>(object) } -> std::same_as<bool>;
+};
+
+// -- STRUCTS --
+struct SlotMapStats {
+    /**
+     * Amount of objects in the slot map.
+     **/
+    size_t size {};
+    /**
+     * Amount of slots ever allocated, including free ones.
+     **/
+    size_t slots {};
+    /**
+     * Amount of slots that can be reused by `insert`.
+     **/
+    size_t freeSlots {};
+    /**
+     * Amount of times a slot's generation wrapped around. Once that happens, a stale ID from
+     * `SlotId::maxGeneration + 1` reuses ago resolves to the slot's new object.
+     **/
+    uint64_t generationWraps {};
+    /**
+     * Bytes allocated for the slot map's storage.
+     **/
+    size_t memoryBytes {};
+    /**
+     * Fraction of allocated slots that hold an object.
+     **/
+    float occupancy {};
+};
+
+// -- CLASSES --
+/**
+ * A 32-bit ID of an object in a `SlotMap<T>`, made up of a slot index and the generation of that slot.
+ **/
+template <class T>
+class SlotId {
+public:
+    constexpr static uint32_t indexBits = 20;
+    constexpr static uint32_t generationBits = 32 - indexBits;
+    constexpr static uint32_t maxIndex = (1u << indexBits) - 2;
+    constexpr static uint32_t maxGeneration = (1u << generationBits) - 1;
+
+    constexpr SlotId() = default;
+    constexpr SlotId(uint32_t index, uint32_t generation) : m_value(index | (generation << indexBits)) { }
+
+    [[nodiscard]] constexpr static SlotId fromValue(uint32_t value) {
+        SlotId id;
+        id.m_value = value;
+        return id;
+    }
+
+    [[nodiscard]] constexpr uint32_t value() const { return m_value; }
+    [[nodiscard]] constexpr uint32_t index() const { return m_value & ((1u << indexBits) - 1); }
+    [[nodiscard]] constexpr uint32_t generation() const { return m_value >> indexBits; }
+
+    constexpr operator bool() const { return index() <= maxIndex; }
+    constexpr bool operator==(SlotId const&) const = default;
+
+private:
+    // The all-ones index is never handed out, so it marks an empty ID.
+    uint32_t m_value = (1u << indexBits) - 1;
+};
+
+/**
+ * Dense, array-backed storage of object handles, addressed by generational IDs.
+ *
+ * The handles themselves are stored contiguously, so iterating over every object touches a single array. Resolving an
+ * ID takes a single indirection through the slot array. Every slot has a generation, which is incremented when its
+ * object is removed, so IDs of removed objects are detected instead of resolving to whatever reuses their slot.
+ *
+ * Generations wrap around, so slots can be reused forever. Free slots are reused in the order they were freed, which
+ * spreads reuse over every free slot. A stale ID can only resolve again once its slot has been reused
+ * `SlotId::maxGeneration + 1` times.
+ *
+ * The slot map owns the handles it stores: `erase`, `eraseIf` and `clear` release them, while `take` hands the
+ * reference back to the caller.
+ **/
+template <Object T>
+class SlotMap {
+public:
+    using Id = SlotId<T>;
+
+    SlotMap() = default;
+
+    ~SlotMap() {
+        clear();
+    }
+
+    SlotMap(SlotMap&) = delete;
+    SlotMap(SlotMap&&) = delete;
+    SlotMap& operator=(SlotMap&) = delete;
+    SlotMap& operator=(SlotMap&&) = delete;
+
+    /**
+     * Reserve storage for `count` objects, avoiding reallocations while inserting.
+     **/
+    void reserve(size_t count) {
+        m_objects.reserve(count);
+        m_owners.reserve(count);
+        m_slots.reserve(count);
+    }
+
+    /**
+     * Take ownership of `object`, and return its ID. Returns an empty ID, leaving ownership with the caller, if the map
+     * already holds `SlotId::maxIndex + 1` objects.
+     **/
+    [[nodiscard]] Id insert(T object) {
+        uint32_t index;
+        if (m_freeHead != noSlot) {
+            index = m_freeHead;
+            m_freeHead = m_slots[index].dense;
+            if (m_freeHead == noSlot) {
+                m_freeTail = noSlot;
+            }
+            m_freeSlots--;
+        } else if (m_slots.size() <= Id::maxIndex) {
+            index = static_cast<uint32_t>(m_slots.size());
+            m_slots.push_back({});
+        } else {
+            return {};
+        }
+
+        auto& slot = m_slots[index];
+        slot.dense = static_cast<uint32_t>(m_objects.size());
+        m_objects.push_back(object);
+        m_owners.push_back(index);
+
+        return { index, slot.generation };
+    }
+
+    /**
+     * Whether `id` refers to an object in this slot map.
+     **/
+    [[nodiscard]] bool contains(Id id) const {
+        return denseIndex(id) != noSlot;
+    }
+
+    /**
+     * The object with the given ID, or a null handle if the ID is stale.
+     **/
+    [[nodiscard]] T get(Id id) const {
+        auto dense = denseIndex(id);
+        return dense != noSlot ? m_objects[dense] : T {};
+    }
+
+    /**
+     * Pointer to the stored object with the given ID, or `nullptr` if the ID is stale. The pointer is invalidated by
+     * any insertion or removal.
+     **/
+    [[nodiscard]] T* find(Id id) {
+        auto dense = denseIndex(id);
+        return dense != noSlot ? &m_objects[dense] : nullptr;
+    }
+
+    /**
+     * Remove the object with the given ID without releasing it, and return it. Returns a null handle if the ID is stale.
+     **/
+    [[nodiscard]] T take(Id id) {
+        auto dense = denseIndex(id);
+        if (dense == noSlot) {
+            return {};
+        }
+
+        auto object = m_objects[dense];
+        remove(dense);
+        return object;
+    }
+
+    /**
+     * Release and remove the object with the given ID. Returns whether the ID referred to an object.
+     **/
+    bool erase(Id id) {
+        auto dense = denseIndex(id);
+        if (dense == noSlot) {
+            return false;
+        }
+
+        if (m_objects[dense]) {
+            m_objects[dense].release();
+        }
+
+        remove(dense);
+        return true;
+    }
+
+    /**
+     * Release and remove every object with an ID in `ids`, skipping stale IDs. Returns the amount of removed objects.
+     **/
+    size_t erase(std::span<Id const> ids) {
+        size_t removed = 0;
+        for (auto id : ids) {
+            removed += erase(id);
+        }
+
+        return removed;
+    }
+
+    /**
+     * Release and remove every object for which `predicate(id, object)` returns true. Returns the amount of removed
+     * objects.
+     **/
+    template <class Predicate>
+    size_t eraseIf(Predicate&& predicate) {
+        size_t removed = 0;
+        for (size_t dense = 0; dense < m_objects.size();) {
+            auto index = m_owners[dense];
+            if (!predicate(Id(index, m_slots[index].generation), m_objects[dense])) {
+                dense++;
+                continue;
+            }
+
+            if (m_objects[dense]) {
+                m_objects[dense].release();
+            }
+
+            // Removing swaps the last object into this position, so it is visited next.
+            remove(static_cast<uint32_t>(dense));
+            removed++;
+        }
+
+        return removed;
+    }
+
+    /**
+     * Release and remove every object. Every ID handed out so far becomes stale.
+     **/
+    void clear() {
+        for (auto& object : m_objects) {
+            if (object) {
+                object.release();
+            }
+        }
+
+        for (auto index : m_owners) {
+            free(index);
+        }
+
+        m_objects.clear();
+        m_owners.clear();
+    }
+
+    /**
+     * Call `callback(id, object)` for every object, in storage order.
+     **/
+    template <class Callback>
+    void forEach(Callback&& callback) {
+        for (size_t dense = 0; dense < m_objects.size(); dense++) {
+            auto index = m_owners[dense];
+            callback(Id(index, m_slots[index].generation), m_objects[dense]);
+        }
+    }
+
+    /**
+     * Every stored object, in storage order. Removing an object moves the last object into its place.
+     **/
+    [[nodiscard]] std::span<T> objects() { return m_objects; }
+    [[nodiscard]] std::span<T const> objects() const { return m_objects; }
+
+    [[nodiscard]] size_t size() const { return m_objects.size(); }
+    [[nodiscard]] bool empty() const { return m_objects.empty(); }
+
+    [[nodiscard]] SlotMapStats stats() const {
+        auto slots = m_slots.size();
+        return {
+            .size = m_objects.size(),
+            .slots = slots,
+            .freeSlots = m_freeSlots,
+            .generationWraps = m_generationWraps,
+            .memoryBytes = m_objects.capacity() * sizeof(T)
+                + m_owners.capacity() * sizeof(uint32_t)
+                + m_slots.capacity() * sizeof(Slot),
+            .occupancy = slots ? static_cast<float>(m_objects.size()) / static_cast<float>(slots) : 0.0f,
+        };
+    }
+
+private:
+    constexpr static uint32_t noSlot = UINT32_MAX;
+
+    struct Slot {
+        /**
+         * Position of the object in the dense arrays while occupied, or the next slot in the free list while free.
+         **/
+        uint32_t dense = noSlot;
+        uint32_t generation {};
+    };
+
+    [[nodiscard]] uint32_t denseIndex(Id id) const {
+        if (!id || id.index() >= m_slots.size()) {
+            return noSlot;
+        }
+
+        auto& slot = m_slots[id.index()];
+        if (slot.generation != id.generation() || slot.dense >= m_objects.size()
+            || m_owners[slot.dense] != id.index()) {
+            return noSlot;
+        }
+
+        return slot.dense;
+    }
+
+    void remove(uint32_t dense) {
+        auto index = m_owners[dense];
+        auto last = static_cast<uint32_t>(m_objects.size() - 1);
+
+        if (dense != last) {
+            m_objects[dense] = m_objects[last];
+            m_owners[dense] = m_owners[last];
+            m_slots[m_owners[dense]].dense = dense;
+        }
+
+        m_objects.pop_back();
+        m_owners.pop_back();
+        free(index);
+    }
+
+    void free(uint32_t index) {
+        auto& slot = m_slots[index];
+        slot.dense = noSlot;
+        slot.generation = (slot.generation + 1) & Id::maxGeneration;
+        if (slot.generation == 0) {
+            m_generationWraps++;
+        }
+
+        // Append to the back of the free list, so the slot is reused as late as possible.
+        if (m_freeTail != noSlot) {
+            m_slots[m_freeTail].dense = index;
+        } else {
+            m_freeHead = index;
+        }
+
+        m_freeTail = index;
+        m_freeSlots++;
+    }
+
+    std::vector<T> m_objects;
+    std::vector<uint32_t> m_owners;
+    std::vector<Slot> m_slots;
+    uint32_t m_freeHead = noSlot;
+    uint32_t m_freeTail = noSlot;
+    size_t m_freeSlots {};
+    uint64_t m_generationWraps {};
+};
+
+using BufferMap = SlotMap<Buffer>;
+using TextureMap = SlotMap<Texture>;
+using TextureViewMap = SlotMap<TextureView>;
+using SamplerMap = SlotMap<Sampler>;
+using BindGroupMap = SlotMap<BindGroup>;
+using QuerySetMap = SlotMap<QuerySet>;
+using RenderBundleMap = SlotMap<RenderBundle>;
+
+};
@@ -0,0 +1,30 @@
+import argparse
+import os
+
+import gen.wgsl
+
+parser = argparse.ArgumentParser('reflect.py')
+parser.add_argument('shader', help='WGSL shader to reflect')
+parser.add_argument('--output', help='header file to write the reflected layouts and structs to', required=True)
+parser.add_argument('--namespace', help='C++ namespace to put the reflected definitions in', required=True)
+args = parser.parse_args()
+
+with open(args.shader, 'r') as f:
+    source = f.read()
+
+# Skip shaders that did not change since they were last reflected, so the header is not rewritten
+# and its dependents are not rebuilt.
+if os.path.exists(args.output):
+    with open(args.output, 'r') as f:
+        if gen.wgsl.is_up_to_date(source, f.read()):
+            exit(0)
+
+print('reflecting', args.shader)
+try:
+    cpp_src = gen.wgsl.generate_reflection_hpp(source, os.path.basename(args.shader), args.namespace)
+except gen.wgsl.WgslError as e:
+    exit(f"{args.shader}: {e}")
+
+os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+with open(args.output, 'w') as f:
+    f.write(cpp_src)